@@ -8,6 +8,7 @@ AI SSH 运维助手对话面板。
 from __future__ import annotations
 
 import re
+import threading
 from typing import Optional
 
 from PySide6.QtWidgets import (
@@ -785,8 +786,6 @@ class AIChatPanel(QWidget):
 
         self._optimize_btn.setEnabled(False)
 
-        import threading
-
         def _restore_btn():
             from PySide6.QtCore import QMetaObject, Qt as _Qt, Q_ARG
             QMetaObject.invokeMethod(
@@ -7,12 +7,36 @@
 """
 
 import re
+import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+# 合并执行多条探测命令时，每段输出前的标记行前缀
+_SECTION_MARKER = "==CUBE-SECTION=="
+
+# /etc/os-release 中画像需要的字段
+_OS_RELEASE_KEYS = frozenset({"id", "id_like", "version_id", "pretty_name"})
+
+# 常见系统内部服务前缀/关键字，服务列表中过滤掉
+_SYSTEM_SERVICE_PREFIXES = (
+    "systemd-", "dbus", "polkit", "accounts-daemon",
+    "udisks", "upower", "colord", "rtkit",
+    "avahi", "ModemManager", "NetworkManager-wait",
+    "plymouth", "getty", "serial-getty",
+    "user@", "user-runtime-dir@", "session-",
+)
+
+# 解析探测结果用到的正则，模块加载时编译一次
+_RELEASE_RE = re.compile(r"release\s+(\d+)")
+_SERVICE_SUFFIX_RE = re.compile(r"\.service$")
+_PORT_RE = re.compile(r":(\d+)$")
+_PERCENT_RE = re.compile(r"(\d+)%")
+_PYTHON_VERSION_RE = re.compile(r"Python\s+(\d+\.\d+\.\d+)", re.IGNORECASE)
+
 
 @dataclass
 class ServerProfile:
@@ -54,6 +78,8 @@ class ServerProfileBuilder:
     """服务器画像构建器"""
 
     TTL_SECONDS = 300  # 5 分钟缓存
+    # 并发探测最多同时占用的 SSH 通道数：同一连接上还有终端、SFTP、监控等通道，避免触及 sshd 的 MaxSessions
+    MAX_PARALLEL_PROBES = 2
 
     def __init__(self, ssh_client):
         """
@@ -66,6 +92,13 @@ class ServerProfileBuilder:
         self._ssh = ssh_client
         self._cache: ServerProfile | None = None
         self._cache_time: float = 0
+        # 系统、架构、内核和包管理器在同一连接中不变，缓存结果不随 TTL 过期；
+        # 记录缓存时的 transport，重连后 transport 变化即重新探测
+        self._os_info: dict | None = None
+        self._os_info_transport = None
+        self._package_manager: str = ""
+        # 记录当前线程中的探测是否有远程命令执行失败（并发探测各自独立）
+        self._probe_state = threading.local()
 
     # ------------------------------------------------------------------
     # 公共接口
@@ -90,8 +123,23 @@ class ServerProfileBuilder:
 
         profile = ServerProfile()
 
-        # 检测 OS 基础信息
-        os_info = self._detect_os_info()
+        # 检测 OS 基础信息，连接期间不会变化；强制刷新或重连后重新探测
+        transport = getattr(self._ssh, "transport", None)
+        if force_refresh or transport is not self._os_info_transport:
+            self._os_info = None
+        if self._os_info is None:
+            os_info, failed = self._run_probe(self._detect_os_info)
+            package_manager = self._detect_package_manager(
+                os_info.get("id", ""), os_info.get("id_like", "")
+            )
+            # 探测失败或未识别出系统时不缓存，下次构建重新探测，避免整个会话都沿用空结果
+            if not failed and os_info.get("id"):
+                self._os_info = os_info
+                self._os_info_transport = transport
+                self._package_manager = package_manager
+        else:
+            os_info = self._os_info
+            package_manager = self._package_manager
         profile.os_id = os_info.get("id", "")
         profile.os_version = os_info.get("version_id", "")
         profile.os_pretty_name = os_info.get("pretty_name", "")
@@ -99,32 +147,49 @@ class ServerProfileBuilder:
         profile.has_systemd = os_info.get("has_systemd", True)
         profile.kernel_version = os_info.get("kernel_version", "")
 
-        # 检测包管理器
-        profile.package_manager = self._detect_package_manager(
-            os_info.get("id", ""), os_info.get("id_like", "")
-        )
+        # 包管理器
+        profile.package_manager = package_manager
+
+        # 以下探测互不依赖，并发执行以重叠各自的网络往返；每个探测占用一个 SSH 通道
+        probes = {
+            "runtime": (self._detect_runtime_stats,),
+            "services": (self._detect_running_services, profile.has_systemd),
+            "ports": (self._detect_open_ports,),
+            "shell": (self._detect_shell_type,),
+            "python": (self._detect_python_version,),
+            "docker": (self._detect_docker_installed,),
+        }
+        with ThreadPoolExecutor(max_workers=self.MAX_PARALLEL_PROBES) as pool:
+            futures = {name: pool.submit(self._run_probe, *probe) for name, probe in probes.items()}
+        results = {}
+        for name, future in futures.items():
+            result, failed = future.result()
+            if failed:
+                # 通道打开失败等错误不能当作"没有服务/端口/Docker"，改为串行重试一次
+                result, _ = self._run_probe(*probes[name])
+            results[name] = result
 
         # 获取运行时状态（CPU / 内存 / 磁盘）
-        runtime = self._detect_runtime_stats()
+        runtime = results["runtime"]
         profile.cpu_usage = runtime.get("cpu_usage", 0.0)
         profile.memory_usage = runtime.get("memory_usage", 0.0)
         profile.memory_total_mb = runtime.get("memory_total_mb", 0)
         profile.disk_usage = runtime.get("disk_usage", 0.0)
 
         # 检测运行中的服务
-        profile.running_services = self._detect_running_services(profile.has_systemd)
+        profile.running_services = results["services"]
 
         # 检测开放端口
-        profile.open_ports = self._detect_open_ports()
+        profile.open_ports = results["ports"]
 
         # 检测 Shell 类型
-        profile.shell_type = self._detect_shell_type()
+        profile.shell_type = results["shell"]
 
         # 检测 Python 版本
-        profile.python_version = self._detect_python_version()
+        profile.python_version = results["python"]
 
         # 检测 Docker 是否安装
-        profile.docker_installed = self._detect_docker_installed()
+        profile.docker_installed = results["docker"]
 
         # 获取当前连接用户身份
         username = getattr(self._ssh, 'username', '') or ''
@@ -224,10 +289,55 @@ class ServerProfileBuilder:
         """
         try:
             result = self._ssh.exec(cmd=cmd, pty=False)
-            return (result or "").strip()
         except Exception as e:
             logger.debug(f"远程命令执行失败 [{cmd}]: {e}")
+            result = None
+        if result is None:
+            # exec 返回 None 表示通道打开失败等错误，记录下来供调用方重试
+            self._probe_state.failed = True
             return ""
+        return result.strip()
+
+    def _run_probe(self, probe, *args):
+        """执行一个探测方法
+
+        Args:
+            probe: 探测方法
+            *args: 传给探测方法的参数
+
+        Returns:
+            (探测结果, 期间是否有远程命令执行失败)
+        """
+        self._probe_state.failed = False
+        result = probe(*args)
+        return result, self._probe_state.failed
+
+    def _exec_sections(self, commands: dict[str, str]) -> dict[str, str]:
+        """在一次远程调用中依次执行多条命令，按名称返回各自的输出
+
+        Args:
+            commands: 名称到 shell 命令的映射，按插入顺序执行
+
+        Returns:
+            名称到输出的字典（已去除首尾空白），执行失败时各项为空字符串
+        """
+        # 标记行前先补一个换行：上一条命令的输出没有以换行结尾时（例如手工编辑过的 release 文件），
+        # 标记仍然独占一行，不会接在上一段的末尾
+        script = "; ".join(
+            f"printf '\\n%s\\n' '{_SECTION_MARKER}{name}'; {cmd}" for name, cmd in commands.items()
+        )
+        sections = dict.fromkeys(commands, "")
+        name = None
+        lines: list[str] = []
+        for line in self._safe_exec(script).splitlines() + [_SECTION_MARKER]:
+            if line.startswith(_SECTION_MARKER):
+                if name in sections:
+                    sections[name] = "\n".join(lines).strip()
+                name = line[len(_SECTION_MARKER):]
+                lines = []
+            else:
+                lines.append(line)
+        return sections
 
     def _detect_os_info(self) -> dict:
         """检测 OS 信息（通过 /etc/os-release 和 uname）
@@ -237,22 +347,28 @@ class ServerProfileBuilder:
         """
         info: dict[str, str] = {}
 
+        # 所有探测合并为一次远程调用，各段输出以标记行分隔
+        sections = self._exec_sections({
+            "os_release": "cat /etc/os-release 2>/dev/null",
+            "redhat_release": "cat /etc/redhat-release 2>/dev/null",
+            "arch": "uname -m 2>/dev/null",
+            "kernel": "uname -r 2>/dev/null",
+            "systemd": "command -v systemctl >/dev/null 2>&1 && echo 'yes' || echo 'no'",
+        })
+
         # --- 解析 /etc/os-release ---
-        out = self._safe_exec("cat /etc/os-release 2>/dev/null || true")
+        out = sections.get("os_release")
         if out:
+            # 只保留画像用到的字段，其余行直接跳过
             for line in out.splitlines():
-                if "=" not in line:
-                    continue
-                k, v = line.split("=", 1)
-                k = (k or "").strip()
-                v = (v or "").strip().strip('"').strip("'")
-                if k:
-                    info[k.lower()] = v
+                k, sep, v = line.partition("=")
+                k = k.strip().lower()
+                if sep and k in _OS_RELEASE_KEYS:
+                    info[k] = v.strip().strip('"').strip("'")
 
         # --- 备用: /etc/redhat-release ---
         if not info.get("id"):
-            out2 = self._safe_exec("cat /etc/redhat-release 2>/dev/null || true")
-            txt = (out2 or "").strip()
+            txt = (sections.get("redhat_release") or "").strip()
             if txt:
                 info["pretty_name"] = info.get("pretty_name") or txt
                 low = txt.lower()
@@ -260,24 +376,22 @@ class ServerProfileBuilder:
                     info["id"] = "centos"
                 elif "red hat" in low or "rhel" in low:
                     info["id"] = "rhel"
-                m = re.search(r"release\s+(\d+)", low)
+                m = _RELEASE_RE.search(low)
                 if m:
                     info["version_id"] = info.get("version_id") or m.group(1)
 
         # --- 架构 ---
-        arch_out = self._safe_exec("uname -m 2>/dev/null || true")
+        arch_out = sections.get("arch")
         if arch_out:
             info["arch"] = arch_out.strip()
 
         # --- 内核版本 ---
-        kernel_out = self._safe_exec("uname -r 2>/dev/null || true")
+        kernel_out = sections.get("kernel")
         if kernel_out:
             info["kernel_version"] = kernel_out.strip()
 
         # --- systemd 检测 ---
-        systemd_out = self._safe_exec(
-            "command -v systemctl >/dev/null 2>&1 && echo 'yes' || echo 'no'"
-        )
+        systemd_out = sections.get("systemd")
         info["has_systemd"] = "yes" in systemd_out.lower() if systemd_out else False
 
         return info
@@ -315,12 +429,14 @@ class ServerProfileBuilder:
         if os_id_lower in {"arch", "manjaro"} or "arch" in id_like_lower:
             return "pacman"
 
-        # 回退: 按优先级逐一探测
+        # 回退: 按优先级探测，所有候选在一次远程调用中完成，输出第一个存在的命令
         candidates = ["apt", "dnf", "yum", "zypper", "apk", "pacman"]
-        for mgr in candidates:
-            check = self._safe_exec(f"command -v {mgr} 2>/dev/null && echo 'found'")
-            if "found" in check:
-                return mgr
+        found = self._safe_exec(
+            f"for m in {' '.join(candidates)}; do "
+            "command -v $m >/dev/null 2>&1 && { echo $m; break; }; done"
+        )
+        if found in candidates:
+            return found
 
         return ""
 
@@ -350,7 +466,7 @@ class ServerProfileBuilder:
                     if parts:
                         svc_name = parts[0]
                         # 去掉 .service 后缀
-                        svc_name = re.sub(r"\.service$", "", svc_name)
+                        svc_name = _SERVICE_SUFFIX_RE.sub("", svc_name)
                         # 过滤掉系统内部服务，只保留常见应用服务
                         if not self._is_system_service(svc_name):
                             services.append(svc_name)
@@ -384,15 +500,7 @@ class ServerProfileBuilder:
         Returns:
             True 表示是系统内部服务，应过滤
         """
-        # 常见系统内部服务前缀/关键字
-        system_prefixes = (
-            "systemd-", "dbus", "polkit", "accounts-daemon",
-            "udisks", "upower", "colord", "rtkit",
-            "avahi", "ModemManager", "NetworkManager-wait",
-            "plymouth", "getty", "serial-getty",
-            "user@", "user-runtime-dir@", "session-",
-        )
-        return any(name.startswith(p) for p in system_prefixes)
+        return name.startswith(_SYSTEM_SERVICE_PREFIXES)
 
     def _detect_open_ports(self) -> list[int]:
         """检测开放的监听端口
@@ -420,7 +528,7 @@ class ServerProfileBuilder:
                 parts = line.split()
                 for part in parts:
                     # 匹配 *:port, 0.0.0.0:port, :::port, [::]:port 等
-                    m = re.search(r":(\d+)$", part)
+                    m = _PORT_RE.search(part)
                     if m:
                         port = int(m.group(1))
                         if 1 <= port <= 65535:
@@ -510,7 +618,7 @@ class ServerProfileBuilder:
             parts = out.split()
             # 寻找百分比列
             for part in parts:
-                m = re.match(r"(\d+)%", part)
+                m = _PERCENT_RE.match(part)
                 if m:
                     stats["disk_usage"] = float(m.group(1))
                     break
@@ -540,7 +648,7 @@ class ServerProfileBuilder:
             "python3 --version 2>/dev/null || python --version 2>/dev/null || true"
         )
         if out:
-            m = re.search(r"Python\s+(\d+\.\d+\.\d+)", out, re.IGNORECASE)
+            m = _PYTHON_VERSION_RE.search(out)
             if m:
                 return m.group(1)
         return ""
@@ -11,9 +11,11 @@ SSHAIAgent 是 AI SSH 运维功能的核心调度中枢，负责：
 
 from __future__ import annotations
 
+import codecs
 import json
 import os
 import re
+import select
 import subprocess
 import sys
 import threading
@@ -33,6 +35,30 @@ from .secrets import get_ai_api_key
 from .server_profile import ServerProfileBuilder
 
 
+# 流式读取命令输出时每次 recv 的最大字节数
+_RECV_CHUNK = 65536
+
+# 下载/安装/构建等长时间运行的命令，需要流式读取输出；各模式合并为一个正则，模块加载时编译一次
+_LONG_RUNNING_RE = re.compile("|".join([
+    r'\bwget\b', r'\bcurl\b.*(-o|-O|--output)',
+    r'\bcurl\b.*\|',
+    r'\bapt\b', r'\bapt-get\b',
+    r'\byum\b', r'\bdnf\b',
+    r'\bpacman\b', r'\bzypper\b',
+    r'\bpip\s+install\b', r'\bnpm\s+install\b',
+    r'\byarn\s+(add|install)\b',
+    r'\bmake\b', r'\bmvn\b', r'\bgradle\b',
+    r'\bdocker\s+(pull|build)\b',
+    r'\bgit\s+clone\b',
+    r'\brsync\b', r'\bscp\b',
+]))
+
+# 识别命令中的 sudo 及其是否已带 -S（从 stdin 读取密码）
+_SUDO_RE = re.compile(r'\bsudo\b')
+_SUDO_STDIN_RE = re.compile(r'\bsudo\s+.*-S')
+_SUDO_WITHOUT_STDIN_RE = re.compile(r'\bsudo\b(?!\s*-S)')
+
+
 # ──────────────────────────── Function Calling 工具定义 ────────────────────────────
 
 TOOLS = [
@@ -454,6 +480,8 @@ class _CommandExecThread(QThread):
         self._last_emit_time: float = 0.0          # 上次发射 output_stream 的时间
         self._EMIT_INTERVAL: float = 0.2            # 最小发射间隔（秒），防止高频更新导致 UI 崩溃
         self._terminal_executor = terminal_executor
+        # 连接用户在执行期间不会变化，只判断一次
+        self._is_root = getattr(ssh_client, 'username', None) == 'root'
 
     def request_stop(self):
         self._stop_flag = True
@@ -606,6 +634,24 @@ class _CommandExecThread(QThread):
             self.output_stream.emit(text)
             self._last_emit_time = now
 
+    def _consume_chunk(self, buf: str, chunk: str, lines: list[str]) -> str:
+        """把新读到的输出拼到未完成的行上，完整的行追加到 lines 并推送到 UI。
+
+        每个分块只切分一次，避免逐行 split 反复复制剩余的大段文本。
+
+        Returns:
+            尚未以换行结束的剩余文本
+        """
+        *complete, buf = (buf + chunk).split('\n')
+        for line in complete:
+            lines.append(line)
+            self._throttled_emit(line.rstrip())
+        # 处理 \r 覆盖行（wget/curl 进度条用 \r 刷新同一行），只保留最后一次刷新
+        if '\r' in buf:
+            buf = buf.rpartition('\r')[2]
+            self._throttled_emit(buf.rstrip())
+        return buf
+
     def _stream_read_output(self, stdout_ch, stderr_ch) -> tuple[str, str]:
         """流式读取 stdout 和 stderr，实时推送进度到 UI。
 
@@ -620,54 +666,43 @@ class _CommandExecThread(QThread):
         stderr_lines = []
         stdout_buf = ""
         stderr_buf = ""
+        # 增量解码：分块边界切开的多字节 UTF-8 字符留到下一块再解码
+        stdout_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        stderr_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
 
         while not channel.exit_status_ready() or channel.recv_ready() or channel.recv_stderr_ready():
             if self._stop_flag:
+                # 关闭通道，后面读取剩余数据和 recv_exit_status 不再等待远程命令结束
+                channel.close()
                 break
 
             got_data = False
 
             # 读取 stdout
             if channel.recv_ready():
-                chunk = channel.recv(4096).decode('utf-8', errors='replace')
-                stdout_buf += chunk
+                chunk = stdout_decoder.decode(channel.recv(_RECV_CHUNK))
+                stdout_buf = self._consume_chunk(stdout_buf, chunk, stdout_lines)
                 got_data = True
-                while '\n' in stdout_buf:
-                    line, stdout_buf = stdout_buf.split('\n', 1)
-                    stdout_lines.append(line)
-                    self._throttled_emit(line.rstrip())
-                if '\r' in stdout_buf:
-                    parts = stdout_buf.split('\r')
-                    self._throttled_emit(parts[-1].rstrip())
-                    stdout_buf = parts[-1]
 
             # 读取 stderr（wget/curl 进度条输出在这里）
             if channel.recv_stderr_ready():
-                chunk = channel.recv_stderr(4096).decode('utf-8', errors='replace')
-                stderr_buf += chunk
+                chunk = stderr_decoder.decode(channel.recv_stderr(_RECV_CHUNK))
+                stderr_buf = self._consume_chunk(stderr_buf, chunk, stderr_lines)
                 got_data = True
-                while '\n' in stderr_buf:
-                    line, stderr_buf = stderr_buf.split('\n', 1)
-                    stderr_lines.append(line)
-                    self._throttled_emit(line.rstrip())
-                # 处理 \r 覆盖行（wget/curl 进度条用 \r 刷新同一行）
-                if '\r' in stderr_buf:
-                    parts = stderr_buf.split('\r')
-                    self._throttled_emit(parts[-1].rstrip())
-                    stderr_buf = parts[-1]
 
             if not got_data:
-                time.sleep(0.1)
+                # 阻塞等待通道上有新数据，超时后再检查停止标志和退出状态
+                select.select([channel], [], [], 0.1)
 
         # 读取剩余数据
         try:
-            remaining_out = stdout_ch.read().decode('utf-8', errors='replace')
+            remaining_out = stdout_decoder.decode(stdout_ch.read(), final=True)
             if remaining_out:
                 stdout_buf += remaining_out
         except Exception:
             pass
         try:
-            remaining_err = stderr_ch.read().decode('utf-8', errors='replace')
+            remaining_err = stderr_decoder.decode(stderr_ch.read(), final=True)
             if remaining_err:
                 stderr_buf += remaining_err
         except Exception:
@@ -683,24 +718,7 @@ class _CommandExecThread(QThread):
     @staticmethod
     def _is_long_running_command(cmd: str) -> bool:
         """判断命令是否为长时间运行命令（需要流式输出）。"""
-        import re
-        _LONG_RUNNING_PATTERNS = [
-            r'\bwget\b', r'\bcurl\b.*(-o|-O|--output)',
-            r'\bcurl\b.*\|',
-            r'\bapt\b', r'\bapt-get\b',
-            r'\byum\b', r'\bdnf\b',
-            r'\bpacman\b', r'\bzypper\b',
-            r'\bpip\s+install\b', r'\bnpm\s+install\b',
-            r'\byarn\s+(add|install)\b',
-            r'\bmake\b', r'\bmvn\b', r'\bgradle\b',
-            r'\bdocker\s+(pull|build)\b',
-            r'\bgit\s+clone\b',
-            r'\brsync\b', r'\bscp\b',
-        ]
-        for pattern in _LONG_RUNNING_PATTERNS:
-            if re.search(pattern, cmd):
-                return True
-        return False
+        return _LONG_RUNNING_RE.search(cmd) is not None
 
     def _needs_sudo_password(self, cmd: str) -> bool:
         """判断命令是否需要 sudo 密码。
@@ -709,23 +727,20 @@ class _CommandExecThread(QThread):
         如果命令中包含 sudo 且已经有 -S 标志，则不需要重复处理。
         """
         # root 用户不需要 sudo 密码
-        if hasattr(self._ssh, 'username') and self._ssh.username == 'root':
+        if self._is_root:
             return False
-        # 检查命令中是否包含 sudo
-        import re
         # 匹配命令中的 sudo（作为独立单词）
-        if not re.search(r'\bsudo\b', cmd):
+        if not _SUDO_RE.search(cmd):
             return False
         # 已经有 -S 标志的不需要再处理
-        if re.search(r'\bsudo\s+.*-S', cmd) or re.search(r'\bsudo\s+-S', cmd):
+        if _SUDO_STDIN_RE.search(cmd):
             return False
         return True
 
     def _inject_sudo_stdin_flag(self, cmd: str) -> str:
         """将命令中的 sudo 替换为 sudo -S，使其从 stdin 读取密码。"""
-        import re
         # 将 "sudo " 替换为 "sudo -S "，保留其他参数
-        return re.sub(r'\bsudo\b(?!\s*-S)', 'sudo -S', cmd)
+        return _SUDO_WITHOUT_STDIN_RE.sub('sudo -S', cmd)
 
 
 # ──────────────────────────── SSHAIAgent 核心类 ────────────────────────────
@@ -1,9 +1,246 @@
 # -*- coding: utf-8 -*-
+import contextlib
+import gzip
+import os
 import shlex
-from PySide6.QtCore import QThread, Signal
+import shutil
+import socket
+import stat
+import subprocess
+import tarfile
+import time
+import zipfile
 
+from PySide6.QtCore import QThread, Signal
 
-class CompressThread(QThread):
+# python-isal（Intel ISA-L，SIMD 加速的 gzip）为可选依赖：安装后本机 tar.gz 压缩/解压优先使用，否则走标准库
+try:
+    from isal import igzip, igzip_threaded
+except ImportError:
+    igzip = igzip_threaded = None
+
+# 本机压缩/解压的拷贝缓冲区：tarfile/zipfile 默认只有 16 KiB，大文件会产生大量 read/write 调用
+_COPY_BUFSIZE = 1024 * 1024
+
+# 进度信号的最小发送间隔（秒）
+_PROGRESS_INTERVAL = 0.05
+
+# 远程压缩时文件列表（转义后）超过该长度就改为通过 stdin 传给 tar/zip，避免命令行超长
+_MAX_INLINE_FILES_LEN = 64 * 1024
+
+# shell 找不到命令时的退出码
+_EXIT_COMMAND_NOT_FOUND = 127
+
+# 远程命令执行期间最多保留的输出字节数（用于失败时的错误信息）
+_OUTPUT_LIMIT = 1024 * 1024
+
+# 远程批量解压时，每个压缩包执行完毕后输出的标记行前缀：<前缀><序号>:<退出码>
+_STEP_MARKER = "::CUBE_STEP::"
+
+# posix_fadvise 仅在 Linux 等平台可用（Windows / macOS 没有）
+_HAS_FADVISE = hasattr(os, "posix_fadvise")
+
+# 本身已是压缩格式的文件，再 deflate 几乎没有收益，zip 中直接以 STORED 方式存储
+_STORED_EXTENSIONS = frozenset({
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar",
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".mp3", ".mp4", ".mkv", ".avi", ".mov",
+})
+
+# ZipInfo.compress_level 从 Python 3.13 起才是公开属性；更早的版本只能交给 ZipFile.write 套用 ZipFile 的压缩级别
+_ZIPINFO_HAS_COMPRESS_LEVEL = hasattr(zipfile.ZipInfo, "compress_level")
+
+
+@contextlib.contextmanager
+def _open_source(fp):
+    """
+    打开待压缩的源文件（1 MiB 缓冲）
+
+    支持 posix_fadvise 的平台上提示内核按顺序读（加大预读窗口），读完后丢弃该文件的页缓存，
+    避免一次压缩大量数据把系统里其他进程的缓存挤掉
+    """
+    with open(fp, "rb", buffering=_COPY_BUFSIZE) as f:
+        if _HAS_FADVISE:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        yield f
+        if _HAS_FADVISE:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def _zip_info(zf, fp, arcname):
+    """
+    构造 zip 条目信息：已压缩格式的文件使用 STORED，其余沿用 ZipFile 的压缩方式
+    """
+    zinfo = zipfile.ZipInfo.from_file(fp, arcname)
+    if os.path.splitext(fp)[1].lower() in _STORED_EXTENSIONS:
+        zinfo.compress_type = zipfile.ZIP_STORED
+    else:
+        zinfo.compress_type = zf.compression
+    if _ZIPINFO_HAS_COMPRESS_LEVEL:
+        zinfo.compress_level = zf.compresslevel
+    return zinfo
+
+
+def _zip_write(zf, zinfo, fp):
+    """
+    与 ZipFile.write 等价，能在 ZipInfo 上设置压缩级别时使用 1 MiB 缓冲区流式写入
+    """
+    if not _ZIPINFO_HAS_COMPRESS_LEVEL:
+        zf.write(fp, arcname=zinfo.filename, compress_type=zinfo.compress_type)
+        return
+    with _open_source(fp) as src, zf.open(zinfo, "w") as dst:
+        shutil.copyfileobj(src, dst, _COPY_BUFSIZE)
+
+
+def _walk_files(dir_path, arc_dir):
+    """
+    用 os.scandir 遍历目录，生成 (文件路径, zip 内路径)
+
+    scandir 直接带回条目类型，比 os.walk + isdir 少一轮 stat；与 os.walk 一样不跟随指向目录的符号链接
+    """
+    stack = [(dir_path, arc_dir)]
+    while stack:
+        path, arc = stack.pop()
+        with os.scandir(path) as it:
+            for entry in it:
+                entry_arc = os.path.join(arc, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, entry_arc))
+                elif not entry.is_dir():
+                    yield entry.path, entry_arc
+
+
+@contextlib.contextmanager
+def _open_tar_gz_writer(out_path):
+    """
+    以写模式打开 .tar.gz，gzip 压缩按 isal 多线程 > pigz 子进程 > 标准库 GzipFile 的顺序选择实现
+    """
+    threads = os.cpu_count() or 1
+    if igzip_threaded is not None:
+        # 多线程 igzip 的写句柄不支持 seek，只能用流式写模式
+        with igzip_threaded.open(out_path, "wb", compresslevel=2, threads=threads) as gz, \
+                tarfile.open(fileobj=gz, mode="w|", copybufsize=_COPY_BUFSIZE) as tf:
+            yield tf
+        return
+
+    pigz = shutil.which("pigz")
+    if pigz:
+        with open(out_path, "wb") as out:
+            proc = subprocess.Popen([pigz, "-p", str(threads), "-c"], stdin=subprocess.PIPE, stdout=out)
+            try:
+                # 管道不支持 tell/seek，只能用流式写模式
+                with tarfile.open(fileobj=proc.stdin, mode="w|", copybufsize=_COPY_BUFSIZE) as tf:
+                    yield tf
+            finally:
+                proc.stdin.close()
+                returncode = proc.wait()
+        if returncode != 0:
+            raise OSError(f"pigz exited with status {returncode}")
+        return
+
+    # 先写未压缩的 tar 流，再交给 GzipFile 压缩，外层用 1 MiB 的 BufferedWriter 落盘，
+    # 避免 "w:gz" 模式下 tar 记录块与 gzip 缓冲区（默认 10 KiB）互相牵制
+    with open(out_path, "wb", buffering=_COPY_BUFSIZE) as raw, \
+            gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as gz, \
+            tarfile.open(fileobj=gz, mode="w", copybufsize=_COPY_BUFSIZE) as tf:
+        yield tf
+
+
+@contextlib.contextmanager
+def _open_tar_reader(fp):
+    """
+    以读模式打开 .tar / .tar.gz / .tgz，安装了 isal 时 gzip 解压使用 ISA-L；解压时以 1 MiB 缓冲区写出文件
+    """
+    if fp.endswith(".tar"):
+        with tarfile.open(fp, "r:", copybufsize=_COPY_BUFSIZE) as tf:
+            yield tf
+    elif igzip is not None:
+        with igzip.open(fp, "rb") as gz, tarfile.open(fileobj=gz, mode="r:", copybufsize=_COPY_BUFSIZE) as tf:
+            yield tf
+    else:
+        with tarfile.open(fp, "r:gz", copybufsize=_COPY_BUFSIZE) as tf:
+            yield tf
+
+
+def _remote_tar_gz(tar_args):
+    """
+    生成远端 tar.gz 命令：服务器装有 pigz（多核 gzip）时交给 pigz 压缩/解压，否则使用 tar -z
+
+    判断放在同一条 shell 命令里完成，不需要额外开通道探测；走 tar 的 --use-compress-program
+    而不是 "tar | pigz" 管道，tar 自身的错误仍能反映在退出码上
+    """
+    return (f"if command -v pigz >/dev/null 2>&1; "
+            f"then tar --use-compress-program=pigz {tar_args}; "
+            f"else tar -z {tar_args}; fi")
+
+
+def _exec_remote(ssh_conn, cmd, stdin_data=None):
+    """
+    在独立的 session 上执行远端命令，stderr 合并进 stdout，之后只需读一条数据流
+
+    :param stdin_data: 可选，写入远端进程 stdin 的数据；写完（或没有数据）后发送 EOF
+    :return: paramiko Channel
+    """
+    channel = ssh_conn.conn.get_transport().open_session()
+    # 必须在 exec 之前合并，否则早到的 stderr 可能留在单独的缓冲区里
+    channel.set_combine_stderr(True)
+    channel.exec_command(cmd)
+    if stdin_data:
+        channel.sendall(stdin_data)
+    channel.shutdown_write()
+    return channel
+
+
+def _wait_remote(thread, channel, on_output=None):
+    """
+    读取远端命令的输出直到 EOF，再取退出码
+
+    阻塞式 recv 在数据到达时立即返回，输出不会占满通道窗口导致远端进程阻塞；读到 EOF 时退出码
+    已经随之到达，recv_exit_status 不会再等待。recv 带 100 ms 超时，用于响应中断请求
+
+    :param thread: 所在的 QThread，用于响应中断请求
+    :param channel: _exec_remote 返回的 Channel（stderr 已合并）
+    :param on_output: 可选，收到数据块时的回调
+    :return: (退出码, 输出末尾的文本)；中断时关闭通道并返回 None
+    """
+    output = bytearray()
+    channel.settimeout(0.1)
+    while True:
+        if thread.isInterruptionRequested():
+            channel.close()
+            return None
+        try:
+            data = channel.recv(65536)
+        except socket.timeout:
+            continue
+        if not data:
+            break
+        if on_output is not None:
+            on_output(data)
+        output += data
+        # 只保留末尾部分，错误信息一般在最后
+        if len(output) > _OUTPUT_LIMIT:
+            del output[:-_OUTPUT_LIMIT]
+    return channel.recv_exit_status(), output.decode("utf-8", errors="ignore")
+
+
+class _ArchiveThread(QThread):
+    """
+    压缩/解压线程的公共基类：提供逐文件的进度信号
+    """
+    progress_sig = Signal(int, int, str)  # done, total, current name
+
+    _last_progress = 0.0
+
+    def _report_progress(self, done, total, name):
+        # 文件很多时逐个发信号会淹没 GUI 事件队列，这里按时间节流（最后一个总会发出）
+        now = time.monotonic()
+        if done < total and now - self._last_progress < _PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        self.progress_sig.emit(done, total, name)
+
+
+class CompressThread(_ArchiveThread):
     finished_sig = Signal(bool, str)  # success, message
 
     def __init__(self, ssh_conn, files, output_name, format_type, pwd):
@@ -28,10 +265,6 @@ class CompressThread(QThread):
                 # - 不依赖系统 tar/zip 命令，避免不同平台命令缺失/参数差异
                 # - 直接使用 Python 标准库 tarfile/zipfile
                 # - self.files 仍是“相对当前目录”的文件名，保持与远程一致
-                import os
-                import tarfile
-                import zipfile
-
                 base_dir = os.path.expanduser(self.pwd)
                 out_path = os.path.join(base_dir, self.output_name)
 
@@ -40,40 +273,67 @@ class CompressThread(QThread):
                         yield os.path.join(base_dir, rel), rel
 
                 if self.format_type == ".tar.gz":
-                    with tarfile.open(out_path, "w:gz") as tf:
-                        for abs_p, rel_p in _iter_paths():
+                    # gzip 压缩优先走多核实现（isal / pigz），都不可用时退回标准库
+                    total = len(self.files)
+                    paths = list(_iter_paths())
+                    stats = [os.lstat(abs_p) for abs_p, _ in paths]
+                    # 常见情况是只选中了普通文件（没有目录/链接）：直接用已有的 stat 结果构造 TarInfo，
+                    # 省掉 tf.add 对每个文件的 gettarinfo（再次 lstat、硬链接表、用户名/组名查询）和递归判断
+                    only_files = all(stat.S_ISREG(st.st_mode) and st.st_nlink == 1 for st in stats)
+                    with _open_tar_gz_writer(out_path) as tf:
+                        for i, (abs_p, rel_p) in enumerate(paths):
                             if self.isInterruptionRequested():
                                 return
-                            tf.add(abs_p, arcname=rel_p, recursive=True)
+                            if only_files:
+                                st = stats[i]
+                                tarinfo = tarfile.TarInfo(rel_p.replace(os.sep, "/"))
+                                tarinfo.size = st.st_size
+                                tarinfo.mtime = st.st_mtime
+                                tarinfo.mode = stat.S_IMODE(st.st_mode)
+                                tarinfo.uid = st.st_uid
+                                tarinfo.gid = st.st_gid
+                                with _open_source(abs_p) as f:
+                                    tf.addfile(tarinfo, f)
+                            else:
+                                tf.add(abs_p, arcname=rel_p, recursive=True)
+                            self._report_progress(i + 1, total, rel_p)
                     self.finished_sig.emit(True, "Compression task finished")
                     return
 
                 if self.format_type == ".zip":
-                    with zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-                        for abs_p, rel_p in _iter_paths():
+                    # 先完整遍历一遍拿到文件总数用于进度；条目按列存放在两个并列列表里，
+                    # 不为每个文件额外创建元组
+                    src_paths, arc_names = [], []
+                    for abs_p, rel_p in _iter_paths():
+                        if os.path.isdir(abs_p):
+                            # 目录需要递归遍历，把目录下的所有文件逐个加入 zip
+                            for fp, arc in _walk_files(abs_p, rel_p):
+                                if self.isInterruptionRequested():
+                                    return
+                                src_paths.append(fp)
+                                arc_names.append(arc)
+                        else:
+                            src_paths.append(abs_p)
+                            arc_names.append(rel_p)
+                    total = len(src_paths)
+
+                    with zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+                        for i in range(total):
                             if self.isInterruptionRequested():
                                 return
-                            if os.path.isdir(abs_p):
-                                # 目录需要递归 walk，把目录下的所有文件逐个加入 zip
-                                # arcname 使用相对 base_dir 的路径，保证解压后目录结构一致
-                                for root, _dirs, files in os.walk(abs_p):
-                                    if self.isInterruptionRequested():
-                                        return
-                                    for fn in files:
-                                        fp = os.path.join(root, fn)
-                                        arc = os.path.relpath(fp, base_dir)
-                                        zf.write(fp, arcname=arc)
-                            else:
-                                zf.write(abs_p, arcname=rel_p)
+                            _zip_write(zf, _zip_info(zf, src_paths[i], arc_names[i]), src_paths[i])
+                            self._report_progress(i + 1, total, arc_names[i])
                     self.finished_sig.emit(True, "Compression task finished")
                     return
 
                 self.finished_sig.emit(False, f"Unsupported format: {self.format_type}")
                 return
 
-            # 1. Escape filenames to handle spaces/special chars
-            quoted_files = [shlex.quote(f) for f in self.files]
-            files_str = ' '.join(quoted_files)
+            # 1. Escape filenames to handle spaces/special chars (once, as a single string).
+            # Very large selections are fed to tar/zip on stdin instead, so the command line
+            # can't exceed the server's ARG_MAX / sshd command length limits.
+            files_str = ' '.join(map(shlex.quote, self.files))
+            file_list = None
 
             # 2. Construct command
             cmd = ""
@@ -81,48 +341,45 @@ class CompressThread(QThread):
             output_quoted = shlex.quote(self.output_name)
 
             if self.format_type == ".tar.gz":
-                cmd = f"cd {pwd_quoted} && tar -czf {output_quoted} {files_str}"
+                if len(files_str) > _MAX_INLINE_FILES_LEN:
+                    file_list = b"\0".join(f.encode("utf-8") for f in self.files)
+                    files_str = "--null -T -"
+                cmd = f"cd {pwd_quoted} && " + _remote_tar_gz(f"-cf {output_quoted} {files_str}")
             elif self.format_type == ".zip":
-                # Check if zip is installed, if not, try to install it or warn user
-                # We can't easily install it non-interactively across all distros here reliably without sudo.
-                # So we check first.
-                check_cmd = "command -v zip >/dev/null 2>&1"
-                # Executing check synchronously
-                stdin, stdout, stderr = self.ssh_conn.conn.exec_command(check_cmd)
-                if stdout.channel.recv_exit_status() != 0:
-                     self.finished_sig.emit(False, "zip command not found. Please install zip on the server (e.g., 'apt install zip' or 'yum install zip').")
-                     return
-                
-                cmd = f"cd {pwd_quoted} && zip -r {output_quoted} {files_str}"
+                # zip -@ reads one name per line, so names containing newlines stay on the command line
+                if len(files_str) > _MAX_INLINE_FILES_LEN and not any("\n" in f for f in self.files):
+                    file_list = "\n".join(self.files).encode("utf-8")
+                    files_str = "-@"
+                # No separate "command -v zip" probe: a missing zip makes the shell exit with 127,
+                # which is reported below, so the whole job needs only this one channel.
+                # -q: don't stream an "adding: ..." line per file back over SSH
+                cmd = f"cd {pwd_quoted} && zip -r -q {output_quoted} {files_str}"
             else:
                 self.finished_sig.emit(False, f"Unsupported format: {self.format_type}")
                 return
 
             # 3. Execute command using paramiko directly to avoid timeout limits
-            # ssh_conn.conn is the paramiko SSHClient
-            stdin, stdout, stderr = self.ssh_conn.conn.exec_command(cmd)
-
-            # Wait for completion and support cancellation
-            while not stdout.channel.exit_status_ready():
-                if self.isInterruptionRequested():
-                    # Attempt to close channel to stop
-                    stdout.channel.close()
-                    return
-                self.msleep(100)
+            # (the file list, if any, goes to stdin followed by EOF)
+            channel = _exec_remote(self.ssh_conn, cmd, file_list)
 
-            exit_status = stdout.channel.recv_exit_status()
+            # Read output until EOF and support cancellation
+            result = _wait_remote(self, channel)
+            if result is None:
+                return
+            exit_status, error_msg = result
 
             if exit_status == 0:
                 self.finished_sig.emit(True, "Compression task finished")
+            elif exit_status == _EXIT_COMMAND_NOT_FOUND and self.format_type == ".zip":
+                self.finished_sig.emit(False, "zip command not found. Please install zip on the server (e.g., 'apt install zip' or 'yum install zip').")
             else:
-                error_msg = stderr.read().decode('utf-8', errors='ignore')
                 self.finished_sig.emit(False, error_msg or "Unknown error")
 
         except Exception as e:
             self.finished_sig.emit(False, str(e))
 
 
-class DecompressThread(QThread):
+class DecompressThread(_ArchiveThread):
     finished_sig = Signal(bool, str)  # success, message
 
     def __init__(self, ssh_conn, files, pwd):
@@ -142,22 +399,22 @@ class DecompressThread(QThread):
                 # 本机解压：
                 # - 使用标准库 zipfile/tarfile
                 # - 解压属于高风险操作：压缩包可能包含“../”路径或绝对路径，导致目录穿越写文件（zip-slip/tar-slip）
-                # - 这里在 extractall 前做路径校验：任何条目解出来不在 dest_dir 内则拒绝执行
-                import os
-                import tarfile
-                import zipfile
-
+                # - 这里对每个条目做路径校验：任何条目解出来不在 dest_dir 内则拒绝执行（zip 在 extractall 前校验，
+                #   tar 在解压过程中逐条校验，不安全的条目及其之后的条目都不会落盘）
                 dest_dir = os.path.expanduser(self.pwd)
-
-                def _safe_join(base: str, *paths: str) -> str:
-                    return os.path.abspath(os.path.join(base, *paths))
-
-                def _ensure_within_base(base: str, target: str) -> bool:
-                    base_abs = os.path.abspath(base)
-                    target_abs = os.path.abspath(target)
-                    return target_abs == base_abs or target_abs.startswith(base_abs + os.sep)
-
-                for filename in self.files:
+                # 目标目录只做一次 abspath，每个条目只需 normpath + 前缀比较
+                base_abs = os.path.abspath(dest_dir)
+                base_prefix = base_abs if base_abs.endswith(os.sep) else base_abs + os.sep
+
+                def _is_safe(name: str) -> bool:
+                    # 含 NUL 或带盘符（Windows 下 join 会切换到其他盘）的条目直接拒绝
+                    if "\0" in name or os.path.splitdrive(name)[0]:
+                        return False
+                    target = os.path.normpath(os.path.join(base_abs, name))
+                    return target == base_abs or target.startswith(base_prefix)
+
+                total = len(self.files)
+                for i, filename in enumerate(self.files):
                     if self.isInterruptionRequested():
                         return
 
@@ -166,82 +423,103 @@ class DecompressThread(QThread):
                         with zipfile.ZipFile(fp, "r") as zf:
                             # zip-slip 防护：校验每个 entry 的落盘路径都在 dest_dir 内
                             for info in zf.infolist():
-                                out_path = _safe_join(dest_dir, info.filename)
-                                if not _ensure_within_base(dest_dir, out_path):
+                                if not _is_safe(info.filename):
                                     self.finished_sig.emit(False, f"Unsafe zip entry: {info.filename}")
                                     return
                             zf.extractall(dest_dir)
-                    elif fp.endswith(".tar.gz") or fp.endswith(".tgz"):
-                        with tarfile.open(fp, "r:gz") as tf:
-                            # tar-slip 防护：校验每个 member 的落盘路径都在 dest_dir 内
-                            for member in tf.getmembers():
-                                out_path = _safe_join(dest_dir, member.name)
-                                if not _ensure_within_base(dest_dir, out_path):
-                                    self.finished_sig.emit(False, f"Unsafe tar entry: {member.name}")
+                    elif fp.endswith((".tar.gz", ".tgz", ".tar")):
+                        unsafe = []
+
+                        def _checked_members(tf):
+                            # tar-slip 防护：边读边校验，遇到落盘路径不在 dest_dir 内的 member 立即停止
+                            # 不再先 getmembers() 整包扫描一遍再 extractall 扫描第二遍
+                            for member in tf:
+                                if not _is_safe(member.name):
+                                    unsafe.append(member.name)
                                     return
-                            tf.extractall(dest_dir)
-                    elif fp.endswith(".tar"):
-                        with tarfile.open(fp, "r:") as tf:
-                            # tar-slip 防护：校验每个 member 的落盘路径都在 dest_dir 内
-                            for member in tf.getmembers():
-                                out_path = _safe_join(dest_dir, member.name)
-                                if not _ensure_within_base(dest_dir, out_path):
-                                    self.finished_sig.emit(False, f"Unsafe tar entry: {member.name}")
-                                    return
-                            tf.extractall(dest_dir)
+                                yield member
+
+                        with _open_tar_reader(fp) as tf:
+                            if hasattr(tarfile, "data_filter"):
+                                # Python 3.12（以及 3.11.4 等安全更新版本）自带 "data" 解压过滤器（PEP 706），
+                                # 路径穿越、指向外部的链接、设备文件等都会在解压同一轮中被拒绝
+                                try:
+                                    tf.extractall(dest_dir, filter="data")
+                                except tarfile.FilterError as e:
+                                    unsafe.append(e.tarinfo.name)
+                            else:
+                                tf.extractall(dest_dir, members=_checked_members(tf))
+                        if unsafe:
+                            self.finished_sig.emit(False, f"Unsafe tar entry: {unsafe[0]}")
+                            return
                     else:
                         self.finished_sig.emit(False, f"Unsupported archive format: {filename}")
                         return
+                    self._report_progress(i + 1, total, filename)
 
                 self.finished_sig.emit(True, "Decompression task finished")
                 return
 
             pwd_quoted = shlex.quote(self.pwd)
-            
-            for filename in self.files:
-                # Check cancellation before each file
-                if self.isInterruptionRequested():
-                    return
 
+            # Build one extraction command per archive up front
+            commands = []
+            for filename in self.files:
                 file_quoted = shlex.quote(filename)
-                cmd = ""
-                
+
                 # Determine command based on extension
                 if filename.endswith(".zip"):
-                    # Check for zip/unzip command
-                    check_cmd = "command -v unzip >/dev/null 2>&1"
-                    stdin, stdout, stderr = self.ssh_conn.conn.exec_command(check_cmd)
-                    if stdout.channel.recv_exit_status() != 0:
-                         self.finished_sig.emit(False, "unzip command not found. Please install unzip on the server.")
-                         return
                     # -o: overwrite without prompting
+                    # -q: don't list every extracted file (nobody reads it)
                     # -d: destination directory
-                    cmd = f"unzip -o {file_quoted} -d {pwd_quoted}"
+                    commands.append(f"unzip -o -q {file_quoted} -d {pwd_quoted}")
                 elif filename.endswith(".tar.gz") or filename.endswith(".tgz"):
-                    cmd = f"tar -xzvf {file_quoted} -C {pwd_quoted}"
+                    commands.append(_remote_tar_gz(f"-xf {file_quoted} -C {pwd_quoted}"))
                 elif filename.endswith(".tar"):
-                    cmd = f"tar -xvf {file_quoted} -C {pwd_quoted}"
+                    commands.append(f"tar -xf {file_quoted} -C {pwd_quoted}")
                 else:
                     # Skip unknown formats or try tar as fallback? 
                     # For now, treat as error or skip
                     self.finished_sig.emit(False, f"Unsupported archive format: {filename}")
                     return
 
-                # Execute
-                stdin, stdout, stderr = self.ssh_conn.conn.exec_command(cmd)
-                
-                # Wait loop
-                while not stdout.channel.exit_status_ready():
-                    if self.isInterruptionRequested():
-                        stdout.channel.close()
-                        return
-                    self.msleep(100)
-                
-                exit_status = stdout.channel.recv_exit_status()
-                if exit_status != 0:
-                    error_msg = stderr.read().decode('utf-8', errors='ignore')
-                    self.finished_sig.emit(False, f"Failed to extract {filename}: {error_msg}")
+            if not commands:
+                self.finished_sig.emit(True, "Decompression task finished")
+                return
+
+            # Run the whole batch in a single remote shell: after each archive a marker line
+            # reports its index and exit status, and the script stops at the first failure.
+            script = "; ".join(
+                f'{cmd}; rc=$?; echo "{_STEP_MARKER}{i}:$rc"; [ $rc -eq 0 ] || exit $rc'
+                for i, cmd in enumerate(commands)
+            )
+            channel = _exec_remote(self.ssh_conn, script)
+
+            # Count the archives that have been extracted successfully from the step markers
+            completed = 0
+            tail = b""
+
+            def _on_output(data):
+                nonlocal completed, tail
+                *lines, tail = (tail + data).split(b"\n")
+                for line in lines:
+                    if line.startswith(_STEP_MARKER.encode()) and line.endswith(b":0"):
+                        completed += 1
+                        self._report_progress(completed, len(self.files), self.files[completed - 1])
+
+            result = _wait_remote(self, channel, _on_output)
+            if result is None:
+                return
+            exit_status, output = result
+            if exit_status != 0:
+                error_msg = "\n".join(line for line in output.splitlines() if not line.startswith(_STEP_MARKER))
+                # The script stops at the first failure, so it is the first archive without a success marker
+                failed = self.files[min(completed, len(self.files) - 1)]
+                if exit_status == _EXIT_COMMAND_NOT_FOUND and failed.endswith(".zip"):
+                    self.finished_sig.emit(False, "unzip command not found. Please install unzip on the server.")
                     return
+                self.finished_sig.emit(False, f"Failed to extract {failed}: {error_msg}")
+                return
 
             self.finished_sig.emit(True, "Decompression task finished")
 
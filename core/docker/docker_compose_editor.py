@@ -1,20 +1,99 @@
+import collections
+import copy
+import io
 import json
 import os
+import select
+import shlex
+import socket
 import threading
+import time
 
 import yaml
-from PySide6.QtCore import Qt, Signal, QSize
-from PySide6.QtGui import QFont, QIcon
+from PySide6.QtCore import Qt, Signal, QSize, QTimer, QRunnable, QThreadPool, QObject
+from PySide6.QtGui import QFont, QIcon, QTextCursor
 from PySide6.QtWidgets import (QWidget, QVBoxLayout,
                                QHBoxLayout, QPushButton, QTreeWidget,
                                QTreeWidgetItem, QLabel, QMessageBox, QLineEdit,
-                               QFormLayout, QScrollArea, QSplitter, QDialog, QDialogButtonBox, QTextEdit, QComboBox)
+                               QFormLayout, QScrollArea, QSplitter, QDialog, QDialogButtonBox, QTextEdit, QComboBox,
+                               QToolButton, QStackedWidget)
 from pygments import highlight
 from pygments.formatters import HtmlFormatter
 from pygments.lexers import get_lexer_by_name
 
 from function import util
 
+# 优先使用 libyaml 的 C 实现解析和序列化，未编译 libyaml 时回退到纯 Python 实现
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# 远程命令输出按批刷新到界面：单次读取大小、最长攒批时间和最大攒批字节数
+_OUTPUT_CHUNK = 64 * 1024
+_OUTPUT_FLUSH_INTERVAL = 0.05
+_OUTPUT_FLUSH_BYTES = 64 * 1024
+
+# 服务配置中列表区条目超过该数量时默认折叠，展开时再创建控件
+_EAGER_SECTION_ITEMS = 20
+
+# 配置 Docker 守护进程的脚本在每个步骤开始前输出的标记行前缀
+_DAEMON_STEP_MARKER = "##CUBE-DAEMON-STEP##"
+
+# 服务列表图标缓存，键为服务名称
+_SERVICE_ICON_CACHE = {}
+
+# 预定义服务解析结果缓存，键为 (配置文件路径, 修改时间, 文件大小)
+_PREDEFINED_SERVICES_CACHE = {}
+
+# 编辑器专用线程池的线程数：compose 命令和守护进程配置各自同一时间只有一个任务，
+# 留出一个线程给配置文件读写，慢速的 pull / 重启不会阻塞加载和保存
+_EDITOR_POOL_THREADS = 3
+
+
+def _pump_channel(channel, emit):
+    """读取通道输出直到 EOF，按整行攒批后通过 emit 回调发送"""
+    channel.settimeout(_OUTPUT_FLUSH_INTERVAL)
+    buf = bytearray()
+    last_flush = time.monotonic()
+    try:
+        while True:
+            try:
+                data = channel.recv(_OUTPUT_CHUNK)
+            except socket.timeout:
+                data = None
+            if data == b'':
+                break
+            if data:
+                buf += data
+            now = time.monotonic()
+            if buf and (len(buf) >= _OUTPUT_FLUSH_BYTES or now - last_flush >= _OUTPUT_FLUSH_INTERVAL):
+                # 只在换行处切分，避免把一行拆成两次高亮
+                end = buf.rfind(b'\n')
+                if end < 0 and len(buf) >= _OUTPUT_FLUSH_BYTES:
+                    end = len(buf)
+                if end >= 0:
+                    emit(bytes(buf[:end]).decode('utf-8', errors='replace'))
+                    del buf[:end + 1]
+                last_flush = now
+        if buf.strip():
+            emit(bytes(buf).decode('utf-8', errors='replace').rstrip('\n'))
+    finally:
+        channel.settimeout(None)
+
+
+def _service_icon(service_name):
+    """服务图标按名称缓存，每个图标在进程内只从资源中加载一次"""
+    icon = _SERVICE_ICON_CACHE.get(service_name)
+    if icon is None:
+        icon = QIcon(f":{service_name}_128.png")
+        _SERVICE_ICON_CACHE[service_name] = icon
+    return icon
+
+
+def _make_line_edit(text="", width=300):
+    edit = QLineEdit(text)
+    edit.setMinimumWidth(width)
+    return edit
+
 
 class ServiceConfigWidget(QWidget):
     config_changed = Signal()
@@ -25,6 +104,16 @@ class ServiceConfigWidget(QWidget):
         self.config = config or {}
         # 保存父窗口引用
         self.parent_window = parent
+        # 删除按钮的样式只在父控件上设置一次，按钮通过属性选择器匹配
+        self.setStyleSheet("QPushButton[cssClass='delbtn'] { color: red; font-weight: bold; }")
+        # 连续删除条目时合并为一次 config_changed 通知
+        self._change_timer = QTimer(self)
+        self._change_timer.setSingleShot(True)
+        self._change_timer.setInterval(150)
+        self._change_timer.timeout.connect(self.config_changed.emit)
+
+        # 批量创建配置条目期间暂停重绘，避免每加一行都重新布局
+        self.setUpdatesEnabled(False)
 
         # 创建主布局
         main_layout = QVBoxLayout()
@@ -51,14 +140,10 @@ class ServiceConfigWidget(QWidget):
         config_container.setLayout(form_layout)
 
         # 基本配置
-        self.image_edit = QLineEdit(self.config.get('image', ''))
-        self.image_edit.setMinimumWidth(300)
-        form_layout.addRow("镜像:", self.image_edit)
+        self.image_edit = self._make_row(form_layout, "镜像:", self.config.get('image', ''))
 
         # 容器名称
-        self.container_name_edit = QLineEdit(self.config.get('container_name', ''))
-        self.container_name_edit.setMinimumWidth(300)
-        form_layout.addRow("容器名称:", self.container_name_edit)
+        self.container_name_edit = self._make_row(form_layout, "容器名称:", self.config.get('container_name', ''))
 
         # 重启策略（下拉选择）
         self.restart_combo = QComboBox()
@@ -91,43 +176,29 @@ class ServiceConfigWidget(QWidget):
         # 如果是列表类型，转换为字符串
         if isinstance(command, list):
             command = ' '.join(command)
-        self.command_edit = QLineEdit(command)
-        self.command_edit.setMinimumWidth(300)
-        self.command_edit.setPlaceholderText("例如: nginx -g 'daemon off;'")
-        form_layout.addRow("命令:", self.command_edit)
-
-        # 依赖服务
-        self.depends_on_container = QWidget()
-        self.depends_on_container.setObjectName("depends_on_container")
-        depends_on_layout = QVBoxLayout()
-        self.depends_on_container.setLayout(depends_on_layout)
-        self.depends_on_list = []
+        self.command_edit = self._make_row(form_layout, "命令:", command, "例如: nginx -g 'daemon off;'")
 
         # Build 配置
         build_container = QWidget()
         build_layout = QVBoxLayout()
         build_container.setLayout(build_layout)
 
+        build_cfg = self.config.get('build') or {}
+
         # Context 路径
-        self.context_edit = QLineEdit(self.config.get('build', {}).get('context', ''))
-        self.context_edit.setMinimumWidth(300)
-        build_layout.addWidget(QLabel("Context 路径:"))
-        build_layout.addWidget(self.context_edit)
+        self.context_edit = self._make_row(build_layout, "Context 路径:", build_cfg.get('context', ''))
 
         # Dockerfile 路径
-        self.dockerfile_edit = QLineEdit(self.config.get('build', {}).get('dockerfile', ''))
-        self.dockerfile_edit.setMinimumWidth(300)
-        build_layout.addWidget(QLabel("Dockerfile 路径:"))
-        build_layout.addWidget(self.dockerfile_edit)
+        self.dockerfile_edit = self._make_row(build_layout, "Dockerfile 路径:", build_cfg.get('dockerfile', ''))
 
         # Build 参数
-        self.build_args_container = QWidget()
-        self.build_args_layout = QVBoxLayout()
-        self.build_args_container.setLayout(self.build_args_layout)
-        self.build_args_list = []
+        self.build_args_container, self.build_args_layout = self._create_list_section(
+            "添加构建参数", self.add_build_arg)
+        # 各列表区的条目按行控件 id 索引，删除时直接按键移除
+        self.build_args_list = {}
 
         # 处理 build args
-        build_args = self.config.get('build', {}).get('args', {})
+        build_args = build_cfg.get('args') or {}
         if isinstance(build_args, dict):
             # 处理字典格式
             for key, value in build_args.items():
@@ -139,106 +210,90 @@ class ServiceConfigWidget(QWidget):
                     key, value = arg.split('=', 1)
                     self.add_build_arg_item(key, value)
 
-        add_build_arg_btn = QPushButton("添加构建参数")
-        add_build_arg_btn.clicked.connect(self.add_build_arg)
-        self.build_args_layout.addWidget(add_build_arg_btn)
-
         build_layout.addWidget(QLabel("构建参数:"))
         build_layout.addWidget(self.build_args_container)
 
         form_layout.addRow("构建配置:", build_container)
 
+        # 以下列表区条目较多时默认折叠，首次展开时才创建条目控件
+        self._pending_sections = {}
+
         # 端口配置
-        self.ports_container = QWidget()
-        self.ports_container.setObjectName("ports_container")
-        ports_layout = QVBoxLayout()
-        self.ports_container.setLayout(ports_layout)
-        self.ports_list = []
-        for port in self.config.get('ports', []):
-            self.add_port_item(port)
-
-        add_port_btn = QPushButton("添加端口")
-        add_port_btn.clicked.connect(self.add_port)
-        ports_layout.addWidget(add_port_btn)
+        self.ports_list = {}
+
+        def load_ports():
+            for port in self.config.get('ports') or []:
+                self.add_port_item(port)
 
+        self.ports_container, self.ports_layout = self._create_list_section(
+            "添加端口", self.add_port, "ports_container", 'ports', load_ports, "端口")
         form_layout.addRow("端口:", self.ports_container)
 
         # 环境变量
-        self.env_container = QWidget()
-        self.env_container.setObjectName("env_container")
-        self.env_layout = QVBoxLayout()
-        self.env_container.setLayout(self.env_layout)
-        self.env_list = []
-
-        # 处理环境变量配置
-        env_config = self.config.get('environment', {})
-        if isinstance(env_config, dict):
-            # 处理字典格式
-            for key, value in env_config.items():
-                self.add_env_item(key, str(value))
-        elif isinstance(env_config, list):
-            # 处理列表格式
-            for env in env_config:
-                if '=' in env:
-                    key, value = env.split('=', 1)
-                    self.add_env_item(key, value)
-
-        add_env_btn = QPushButton("添加环境变量")
-        add_env_btn.clicked.connect(self.add_environment)
-        self.env_layout.addWidget(add_env_btn)
-
+        self.env_list = {}
+
+        def load_environment():
+            # 处理环境变量配置
+            env_config = self.config.get('environment') or {}
+            if isinstance(env_config, dict):
+                # 处理字典格式
+                for key, value in env_config.items():
+                    self.add_env_item(key, str(value))
+            elif isinstance(env_config, list):
+                # 处理列表格式
+                for env in env_config:
+                    if '=' in env:
+                        key, value = env.split('=', 1)
+                        self.add_env_item(key, value)
+
+        self.env_container, self.env_layout = self._create_list_section(
+            "添加环境变量", self.add_environment, "env_container", 'environment', load_environment, "环境变量")
         form_layout.addRow("环境变量:", self.env_container)
 
         # 卷挂载
-        self.volumes_container = QWidget()
-        self.volumes_container.setObjectName("volumes_container")
-        volumes_layout = QVBoxLayout()
-        self.volumes_container.setLayout(volumes_layout)
-        self.volumes_list = []
-        for volume in self.config.get('volumes', []):
-            self.add_volume_item(volume)
-
-        add_volume_btn = QPushButton("添加卷")
-        add_volume_btn.clicked.connect(self.add_volume)
-        volumes_layout.addWidget(add_volume_btn)
+        self.volumes_list = {}
 
-        form_layout.addRow("卷:", self.volumes_container)
+        def load_volumes():
+            for volume in self.config.get('volumes') or []:
+                self.add_volume_item(volume)
 
-        # 处理依赖服务
-        depends_on = self.config.get('depends_on', [])
-        if isinstance(depends_on, list):
-            for service in depends_on:
-                self.add_depends_on_item(service)
-        elif isinstance(depends_on, dict):
-            for service in depends_on.keys():
-                self.add_depends_on_item(service)
-
-        add_depends_on_btn = QPushButton("添加依赖服务")
-        add_depends_on_btn.clicked.connect(self.add_depends_on)
-        depends_on_layout.addWidget(add_depends_on_btn)
+        self.volumes_container, self.volumes_layout = self._create_list_section(
+            "添加卷", self.add_volume, "volumes_container", 'volumes', load_volumes, "卷")
+        form_layout.addRow("卷:", self.volumes_container)
 
+        # 依赖服务
+        self.depends_on_list = {}
+
+        def load_depends_on():
+            # 处理依赖服务
+            depends_on = self.config.get('depends_on') or []
+            if isinstance(depends_on, list):
+                for service in depends_on:
+                    self.add_depends_on_item(service)
+            elif isinstance(depends_on, dict):
+                for service in depends_on.keys():
+                    self.add_depends_on_item(service)
+
+        self.depends_on_container, self.depends_on_layout = self._create_list_section(
+            "添加依赖服务", self.add_depends_on, "depends_on_container", 'depends_on', load_depends_on,
+            "依赖服务")
         form_layout.addRow("依赖服务:", self.depends_on_container)
 
         # 网络配置
-        self.networks_container = QWidget()
-        self.networks_container.setObjectName("networks_container")
-        networks_layout = QVBoxLayout()
-        self.networks_container.setLayout(networks_layout)
-        self.networks_list = []
-
-        # 处理网络配置
-        networks = self.config.get('networks', [])
-        if isinstance(networks, list):
-            for network in networks:
-                self.add_network_item(network)
-        elif isinstance(networks, dict):
-            for network in networks.keys():
-                self.add_network_item(network)
-
-        add_network_btn = QPushButton("添加网络")
-        add_network_btn.clicked.connect(self.add_network)
-        networks_layout.addWidget(add_network_btn)
-
+        self.networks_list = {}
+
+        def load_networks():
+            # 处理网络配置
+            networks = self.config.get('networks') or []
+            if isinstance(networks, list):
+                for network in networks:
+                    self.add_network_item(network)
+            elif isinstance(networks, dict):
+                for network in networks.keys():
+                    self.add_network_item(network)
+
+        self.networks_container, self.networks_layout = self._create_list_section(
+            "添加网络", self.add_network, "networks_container", 'networks', load_networks, "网络")
         form_layout.addRow("网络:", self.networks_container)
 
         # 保存按钮
@@ -246,28 +301,105 @@ class ServiceConfigWidget(QWidget):
         save_btn.clicked.connect(self.save_config)
         main_layout.addWidget(save_btn)
 
+        # 创建默认展开的列表区条目
+        for config_key, (populate, toggle) in list(self._pending_sections.items()):
+            if toggle.isChecked():
+                del self._pending_sections[config_key]
+                populate()
+
+        # 条目全部创建完后再统一布局和重绘
+        self.setUpdatesEnabled(True)
+
+    def _make_row(self, layout, label, text, placeholder=None):
+        """创建带标签的单行输入框并加入布局，表单布局放在同一行，其他布局标签在上"""
+        edit = _make_line_edit(text)
+        if placeholder:
+            edit.setPlaceholderText(placeholder)
+        if isinstance(layout, QFormLayout):
+            layout.addRow(label, edit)
+        else:
+            layout.addWidget(QLabel(label))
+            layout.addWidget(edit)
+        return edit
+
+    def _create_list_section(self, add_text, add_slot, object_name=None, config_key=None, populate=None,
+                             title=None):
+        """创建列表型配置区，条目容器在上、添加按钮在下，返回 (外层容器, 条目布局)
+
+        传入 config_key 和 populate 时，顶部带一个以 title 命名的折叠按钮，折叠只隐藏内容：
+        条目不超过 _EAGER_SECTION_ITEMS 时默认展开，否则默认折叠，首次展开时再调用 populate 创建条目。
+        """
+        container = QWidget()
+        if object_name:
+            container.setObjectName(object_name)
+        layout = QVBoxLayout()
+        container.setLayout(layout)
+
+        content = QWidget()
+        content_layout = QVBoxLayout()
+        content_layout.setContentsMargins(0, 0, 0, 0)
+        content.setLayout(content_layout)
+        layout.addWidget(content)
+
+        # 条目单独放在一个容器中，新增条目直接追加到末尾，无需插入到按钮之前
+        items_widget = QWidget()
+        items_layout = QVBoxLayout()
+        items_layout.setContentsMargins(0, 0, 0, 0)
+        items_widget.setLayout(items_layout)
+        content_layout.addWidget(items_widget)
+
+        add_btn = QPushButton(add_text)
+        add_btn.clicked.connect(add_slot)
+        content_layout.addWidget(add_btn)
+
+        if populate is not None:
+            entries = self.config.get(config_key)
+            count = len(entries) if isinstance(entries, (list, dict)) else 0
+            expanded = count <= _EAGER_SECTION_ITEMS
+
+            toggle = QToolButton()
+            toggle.setText(title)
+            toggle.setCheckable(True)
+            toggle.setChecked(expanded)
+            toggle.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
+            toggle.setArrowType(Qt.DownArrow if expanded else Qt.RightArrow)
+            toggle.setAutoRaise(True)
+            layout.insertWidget(0, toggle)
+            content.setVisible(expanded)
+
+            # 先登记为待创建，展开状态的列表区在构造函数末尾统一创建
+            self._pending_sections[config_key] = (populate, toggle)
+
+            def on_toggled(checked):
+                if checked and config_key in self._pending_sections:
+                    container.setUpdatesEnabled(False)
+                    self._pending_sections.pop(config_key)[0]()
+                    container.setUpdatesEnabled(True)
+                toggle.setArrowType(Qt.DownArrow if checked else Qt.RightArrow)
+                content.setVisible(checked)
+
+            toggle.toggled.connect(on_toggled)
+        return container, items_layout
+
     def add_build_arg_item(self, key="", value=""):
         arg_item = QWidget()
         arg_layout = QHBoxLayout()
-        key_edit = QLineEdit(key)
-        key_edit.setMinimumWidth(150)
-        value_edit = QLineEdit(str(value))
-        value_edit.setMinimumWidth(150)
+        key_edit = _make_line_edit(key, 150)
+        value_edit = _make_line_edit(str(value), 150)
         delete_btn = QPushButton("—")
-        delete_btn.setStyleSheet("color: red; font-weight: bold;")
+        delete_btn.setProperty("cssClass", "delbtn")
         delete_btn.clicked.connect(lambda: self.remove_build_arg(arg_item, key_edit, value_edit))
         arg_layout.addWidget(key_edit)
         arg_layout.addWidget(value_edit)
         arg_layout.addWidget(delete_btn)
         arg_item.setLayout(arg_layout)
-        self.build_args_list.append((key_edit, value_edit))
-        self.build_args_layout.insertWidget(
-            self.build_args_layout.count() - 1, arg_item)
+        self.build_args_list[id(arg_item)] = (key_edit, value_edit)
+        self.build_args_layout.addWidget(arg_item)
 
     def remove_build_arg(self, arg_item, key_edit, value_edit):
-        self.build_args_list.remove((key_edit, value_edit))
+        self.build_args_list.pop(id(arg_item), None)
         arg_item.deleteLater()
-        self.config_changed.emit()
+        self._change_timer.start()
 
     def add_build_arg(self):
         self.add_build_arg_item()
@@ -275,44 +407,40 @@ class ServiceConfigWidget(QWidget):
     def add_port_item(self, port_value=""):
         port_item = QWidget()
         port_layout = QHBoxLayout()
-        port_edit = QLineEdit(port_value)
-        port_edit.setMinimumWidth(300)
+        port_edit = _make_line_edit(port_value)
         delete_btn = QPushButton("—")
-        delete_btn.setStyleSheet("color: red; font-weight: bold;")
+        delete_btn.setProperty("cssClass", "delbtn")
         delete_btn.clicked.connect(lambda: self.remove_port(port_item, port_edit))
         port_layout.addWidget(port_edit)
         port_layout.addWidget(delete_btn)
         port_item.setLayout(port_layout)
-        self.ports_list.append(port_edit)
-        self.ports_container.layout().insertWidget(
-            self.ports_container.layout().count() - 1, port_item)
+        self.ports_list[id(port_item)] = port_edit
+        self.ports_layout.addWidget(port_item)
 
     def remove_port(self, port_item, port_edit):
-        self.ports_list.remove(port_edit)
+        self.ports_list.pop(id(port_item), None)
         port_item.deleteLater()
-        self.config_changed.emit()
+        self._change_timer.start()
 
     def add_env_item(self, key, value):
         env_item = QWidget()
         env_item_layout = QHBoxLayout()
-        key_edit = QLineEdit(key)
-        key_edit.setMinimumWidth(150)
-        value_edit = QLineEdit(str(value))
-        value_edit.setMinimumWidth(150)
+        key_edit = _make_line_edit(key, 150)
+        value_edit = _make_line_edit(str(value), 150)
         delete_btn = QPushButton("—")
-        delete_btn.setStyleSheet("color: red; font-weight: bold;")
+        delete_btn.setProperty("cssClass", "delbtn")
         delete_btn.clicked.connect(lambda: self.remove_env(env_item, key_edit, value_edit))
         env_item_layout.addWidget(key_edit)
         env_item_layout.addWidget(value_edit)
         env_item_layout.addWidget(delete_btn)
         env_item.setLayout(env_item_layout)
-        self.env_list.append((key_edit, value_edit))
-        self.env_layout.insertWidget(self.env_layout.count() - 1, env_item)
+        self.env_list[id(env_item)] = (key_edit, value_edit)
+        self.env_layout.addWidget(env_item)
 
     def remove_env(self, env_item, key_edit, value_edit):
-        self.env_list.remove((key_edit, value_edit))
+        self.env_list.pop(id(env_item), None)
         env_item.deleteLater()
-        self.config_changed.emit()
+        self._change_timer.start()
 
     def add_port(self):
         self.add_port_item()
@@ -323,22 +451,20 @@ class ServiceConfigWidget(QWidget):
     def add_volume_item(self, volume_value=""):
         volume_item = QWidget()
         volume_layout = QHBoxLayout()
-        volume_edit = QLineEdit(volume_value)
-        volume_edit.setMinimumWidth(300)
+        volume_edit = _make_line_edit(volume_value)
         delete_btn = QPushButton("—")
-        delete_btn.setStyleSheet("color: red; font-weight: bold;")
+        delete_btn.setProperty("cssClass", "delbtn")
         delete_btn.clicked.connect(lambda: self.remove_volume(volume_item, volume_edit))
         volume_layout.addWidget(volume_edit)
         volume_layout.addWidget(delete_btn)
         volume_item.setLayout(volume_layout)
-        self.volumes_list.append(volume_edit)
-        self.volumes_container.layout().insertWidget(
-            self.volumes_container.layout().count() - 1, volume_item)
+        self.volumes_list[id(volume_item)] = volume_edit
+        self.volumes_layout.addWidget(volume_item)
 
     def remove_volume(self, volume_item, volume_edit):
-        self.volumes_list.remove(volume_edit)
+        self.volumes_list.pop(id(volume_item), None)
         volume_item.deleteLater()
-        self.config_changed.emit()
+        self._change_timer.start()
 
     def add_volume(self):
         self.add_volume_item()
@@ -346,22 +472,20 @@ class ServiceConfigWidget(QWidget):
     def add_depends_on_item(self, service_name=""):
         depends_on_item = QWidget()
         depends_on_layout = QHBoxLayout()
-        service_edit = QLineEdit(service_name)
-        service_edit.setMinimumWidth(300)
+        service_edit = _make_line_edit(service_name)
         delete_btn = QPushButton("-")
-        delete_btn.setStyleSheet("color: red; font-weight: bold;")
+        delete_btn.setProperty("cssClass", "delbtn")
         delete_btn.clicked.connect(lambda: self.remove_depends_on(depends_on_item, service_edit))
         depends_on_layout.addWidget(service_edit)
         depends_on_layout.addWidget(delete_btn)
         depends_on_item.setLayout(depends_on_layout)
-        self.depends_on_list.append(service_edit)
-        self.depends_on_container.layout().insertWidget(
-            self.depends_on_container.layout().count() - 1, depends_on_item)
+        self.depends_on_list[id(depends_on_item)] = service_edit
+        self.depends_on_layout.addWidget(depends_on_item)
 
     def remove_depends_on(self, depends_on_item, service_edit):
-        self.depends_on_list.remove(service_edit)
+        self.depends_on_list.pop(id(depends_on_item), None)
         depends_on_item.deleteLater()
-        self.config_changed.emit()
+        self._change_timer.start()
 
     def add_depends_on(self):
         self.add_depends_on_item()
@@ -369,30 +493,33 @@ class ServiceConfigWidget(QWidget):
     def add_network_item(self, network_name=""):
         network_item = QWidget()
         network_layout = QHBoxLayout()
-        network_edit = QLineEdit(network_name)
-        network_edit.setMinimumWidth(300)
+        network_edit = _make_line_edit(network_name)
         delete_btn = QPushButton("-")
-        delete_btn.setStyleSheet("color: red; font-weight: bold;")
+        delete_btn.setProperty("cssClass", "delbtn")
         delete_btn.clicked.connect(lambda: self.remove_network(network_item, network_edit))
         network_layout.addWidget(network_edit)
         network_layout.addWidget(delete_btn)
         network_item.setLayout(network_layout)
-        self.networks_list.append(network_edit)
-        self.networks_container.layout().insertWidget(
-            self.networks_container.layout().count() - 1, network_item)
+        self.networks_list[id(network_item)] = network_edit
+        self.networks_layout.addWidget(network_item)
 
     def remove_network(self, network_item, network_edit):
-        self.networks_list.remove(network_edit)
+        self.networks_list.pop(id(network_item), None)
         network_item.deleteLater()
-        self.config_changed.emit()
+        self._change_timer.start()
 
     def add_network(self):
         self.add_network_item()
 
     def save_config(self):
+        # 尚未展开过的列表区没有创建控件，直接沿用原始配置
+        pending = dict.fromkeys(self._pending_sections)
+        for key in pending:
+            pending[key] = self.config.get(key)
+
         # 处理环境变量
         env_dict = {}
-        for key_edit, value_edit in self.env_list:
+        for key_edit, value_edit in self.env_list.values():
             key = key_edit.text().strip()
             value = value_edit.text().strip()
             if key and value:
@@ -400,7 +527,7 @@ class ServiceConfigWidget(QWidget):
 
         # 处理构建参数
         build_args = {}
-        for key_edit, value_edit in self.build_args_list:
+        for key_edit, value_edit in self.build_args_list.values():
             key = key_edit.text().strip()
             value = value_edit.text().strip()
             if key and value:
@@ -416,9 +543,9 @@ class ServiceConfigWidget(QWidget):
             build_config['args'] = build_args
 
         # 处理依赖服务
-        depends_on = [service.text() for service in self.depends_on_list if service.text()]
+        depends_on = [service.text() for service in self.depends_on_list.values() if service.text()]
         # 处理网络配置
-        networks = [network.text() for network in self.networks_list if network.text()]
+        networks = [network.text() for network in self.networks_list.values() if network.text()]
 
         # 更新当前服务的配置
         self.config = {
@@ -426,22 +553,27 @@ class ServiceConfigWidget(QWidget):
             'container_name': self.container_name_edit.text() or None,
             'restart': self.restart_combo.currentText() or None,
             'build': build_config if build_config else None,
-            'ports': [port.text() for port in self.ports_list if port.text()],
+            'ports': [port.text() for port in self.ports_list.values() if port.text()],
             'environment': env_dict,
             'command': self.command_edit.text() or None,
-            'volumes': [volume.text() for volume in self.volumes_list if volume.text()],
+            'volumes': [volume.text() for volume in self.volumes_list.values() if volume.text()],
             'depends_on': depends_on if depends_on else None,
             'networks': networks if networks else None
         }
 
+        self.config.update(pending)
+
         # 移除空值
         self.config = {k: v for k, v in self.config.items() if v is not None}
 
         # 更新主窗口的配置
         if self.parent_window:
             self.parent_window.config['services'][self.service_name] = self.config
+            self.parent_window._config_dirty = True
             self.parent_window.save_config()
 
+        # 保存时立即通知，丢弃尚未触发的删除通知
+        self._change_timer.stop()
         self.config_changed.emit()
 
 
@@ -459,13 +591,20 @@ class ServiceSearchDialog(QDialog):
         search_layout = QHBoxLayout()
         self.search_edit = QLineEdit()
         self.search_edit.setPlaceholderText("输入服务名称搜索...")
-        self.search_edit.textChanged.connect(self.filter_services)
+        # 输入停顿后再过滤，快速输入时不必每个字符都遍历一遍列表
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(80)
+        self._filter_timer.timeout.connect(self.filter_services)
+        self.search_edit.textChanged.connect(self._filter_timer.start)
         search_layout.addWidget(self.search_edit)
         layout.addLayout(search_layout)
 
         # 服务列表
         self.service_list = QTreeWidget()
         self.service_list.setHeaderLabels(["服务名称", "描述"])
+        # 各行等高，视图无需逐行测量高度
+        self.service_list.setUniformRowHeights(True)
         self.service_list.itemDoubleClicked.connect(self.accept)
         layout.addWidget(self.service_list)
 
@@ -491,8 +630,14 @@ class ServiceSearchDialog(QDialog):
         try:
             # 读取配置文件（显式指定UTF-8编码，避免Windows平台GBK解码错误）
             if os.path.exists(config_file):
+                # 文件未变化时直接复用上次的解析结果
+                st = os.stat(config_file)
+                cache_key = (config_file, st.st_mtime_ns, st.st_size)
+                cached = _PREDEFINED_SERVICES_CACHE.get(cache_key)
+                if cached is not None:
+                    return cached
                 with open(config_file, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f) or {}
+                    config = yaml.load(f, Loader=_YAML_LOADER) or {}
                     for name, service_config in config.get('services', {}).items():
                         # 从配置中提取描述信息
                         labels = service_config.get('labels', '')
@@ -500,6 +645,8 @@ class ServiceSearchDialog(QDialog):
                             'description': labels['description'],
                             'config': service_config
                         }
+                _PREDEFINED_SERVICES_CACHE.clear()
+                _PREDEFINED_SERVICES_CACHE[cache_key] = services
         except Exception as e:
             QMessageBox.warning(self, "警告", f"加载预定义服务失败: {str(e)}")
 
@@ -507,23 +654,29 @@ class ServiceSearchDialog(QDialog):
 
     def update_service_list(self):
         self.service_list.clear()
+        # 搜索索引：(条目, 小写的名称和描述)，过滤时无需再读取条目文本
+        self._search_index = []
+        items = []
         for name, info in self.services.items():
             item = QTreeWidgetItem([name, info['description']])
-            self.service_list.addTopLevelItem(item)
+            items.append(item)
+            self._search_index.append((item, f"{name}\x00{info['description']}".lower()))
+        # 一次性批量添加，只触发一次插入通知和重绘
+        self.service_list.setUpdatesEnabled(False)
+        self.service_list.addTopLevelItems(items)
+        self.service_list.setUpdatesEnabled(True)
 
     def filter_services(self):
         search_text = self.search_edit.text().lower()
-        for i in range(self.service_list.topLevelItemCount()):
-            item = self.service_list.topLevelItem(i)
-            name = item.text(0).lower()
-            description = item.text(1).lower()
-            item.setHidden(not (search_text in name or search_text in description))
+        for item, haystack in self._search_index:
+            item.setHidden(search_text not in haystack)
 
     def get_selected_service(self):
         selected_items = self.service_list.selectedItems()
         if selected_items:
             name = selected_items[0].text(0)
-            return name, self.services[name]['config']
+            # 预定义服务在多个对话框间共享，返回副本避免被编辑器修改
+            return name, copy.deepcopy(self.services[name]['config'])
         return None, None
 
 
@@ -551,6 +704,8 @@ class DockerDaemonConfigDialog(QDialog):
             ]
         }
         self.editor.setText(json.dumps(default_config, indent=2))
+        # 最近一次成功解析的 (文本, 配置)，验证后直接应用时不再重复解析
+        self._parsed = None
 
         # 创建按钮
         button_layout = QHBoxLayout()
@@ -573,10 +728,17 @@ class DockerDaemonConfigDialog(QDialog):
         layout.addWidget(self.editor)
         layout.addLayout(button_layout)
 
+    def _parse_config(self):
+        """解析编辑器内容，文本未变化时复用上次的解析结果"""
+        text = self.editor.toPlainText()
+        if self._parsed is None or self._parsed[0] != text:
+            self._parsed = (text, json.loads(text))
+        return self._parsed[1]
+
     def validate_config(self):
         """验证配置是否有效"""
         try:
-            json.loads(self.editor.toPlainText())
+            self._parse_config()
             QMessageBox.information(self, "验证成功", "配置格式正确！")
         except json.JSONDecodeError as e:
             QMessageBox.warning(self, "验证失败", f"配置格式错误：{str(e)}")
@@ -584,12 +746,93 @@ class DockerDaemonConfigDialog(QDialog):
     def get_config(self):
         """获取配置内容"""
         try:
-            return json.loads(self.editor.toPlainText())
+            return self._parse_config()
         except json.JSONDecodeError:
             return {}
 
 
+class _EditorSignals(QObject):
+    """
+    编辑器后台任务发出的信号
+
+    不设父对象，由编辑器和仍在运行的任务共同持有：编辑器窗口销毁后任务再发信号也不会访问已删除的对象，
+    连接到编辑器的槽随编辑器一起断开
+    """
+    # 工作线程产生的输出，经队列连接回到界面线程追加
+    output_ready = Signal(str)
+    output_cleared = Signal()
+    # 后台加载配置文件的结果：(配置, 新建文件时写入的内容，读取已有文件时为 None)
+    config_loaded = Signal(dict, object)
+    config_load_failed = Signal(str)
+    # 后台保存配置文件的结果
+    config_saved = Signal(str)
+    config_save_failed = Signal(str)
+    # 后台配置 Docker 守护进程结束
+    docker_config_finished = Signal()
+
+
+class _CommandRunner(QRunnable):
+    """在线程池中依次执行编辑器排队的 compose 命令，队列取空后退出"""
+
+    def __init__(self, editor):
+        super().__init__()
+        self.editor = editor
+        self.cancelled = False
+
+    def run(self):
+        editor = self.editor
+        while True:
+            with editor._command_lock:
+                if self.cancelled or not editor._command_queue:
+                    if editor._command_runner is self:
+                        editor._command_runner = None
+                    return
+                full_command = editor._command_queue.popleft()
+            editor._run_command(full_command)
+
+
+class _ConfigLoader(QRunnable):
+    """在线程池中读取并解析编辑器的远程配置文件"""
+
+    def __init__(self, editor):
+        super().__init__()
+        self.editor = editor
+        self.signals = editor._signals
+
+    def run(self):
+        try:
+            result = self.editor._read_config()
+        except Exception as e:
+            self.signals.config_load_failed.emit(str(e))
+        else:
+            # 编辑器已在关闭时不再加载
+            if result is not None:
+                self.signals.config_loaded.emit(*result)
+
+
+class _ConfigSaver(QRunnable):
+    """在线程池中把序列化好的配置写入远程文件"""
+
+    def __init__(self, editor, content, seq):
+        super().__init__()
+        self.editor = editor
+        self.signals = editor._signals
+        self.content = content
+        self.seq = seq
+
+    def run(self):
+        try:
+            self.editor._upload_config(self.content, self.seq)
+        except Exception as e:
+            self.signals.config_save_failed.emit(str(e))
+        else:
+            self.signals.config_saved.emit(self.content)
+
+
 class DockerComposeEditor(QWidget):
+    # 窗口已关闭
+    closed = Signal()
+
     def __init__(self, parent=None, ssh=None):
         super().__init__(parent)
         self.setWindowTitle("Docker Compose 可视化编辑器")
@@ -603,11 +846,55 @@ class DockerComposeEditor(QWidget):
         if self.ssh.username != "root":
             self.dirs = f"/home/{self.ssh.username}/app/"
 
+        # 读写配置共用的 SFTP 会话，首次使用时打开；后台加载与保存不能同时使用
+        self._sftp = None
+        self._sftp_lock = threading.Lock()
+        # 服务配置变更后延迟保存，短时间内的多次修改只上传一次
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(300)
+        self._save_timer.timeout.connect(self.save_config)
+        # 后台加载完成前使用空配置
+        self.config = {'services': {}}
+        # 最近一次写入远程的配置内容
+        self._saved_content = None
+        # self.config 在上次保存或加载后是否被修改过
+        self._config_dirty = False
+        # 后台保存状态：同一时间只有一个上传任务，序号用于丢弃过期的写入
+        self._save_running = False
+        self._save_seq = 0
+        self._uploaded_seq = 0
+
+        # 后台 SSH 任务使用编辑器自己的线程池，不占用进程全局线程池
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(_EDITOR_POOL_THREADS)
+        self._signals = _EditorSignals()
+
+        # 按钮触发的 compose 命令排队，同一时间只有一个执行器在线程池中运行
+        self._command_queue = collections.deque()
+        self._command_lock = threading.Lock()
+        self._command_runner = None
+        # 正在执行远程命令的通道，窗口关闭时统一关闭，线程池不必等远程命令自己退出
+        self._active_channels = set()
+        self._closing = False
+
+        # 待刷新到输出区域的文本，工作线程连续输出时合并为一次界面更新
+        self._pending_output = collections.deque()
+
         # 添加日志查看控制变量
         self.logs_running = False
         self.logs_thread = None
         self.logs_channel = None
 
+        # 日志高亮用的词法分析器和格式化器只创建一次，找不到时直接输出原始文本
+        # 高亮结果只带 CSS 类名，样式表在输出区域创建后设置一次
+        try:
+            self._lexer = get_lexer_by_name("docker-compose-log")
+            self._formatter = HtmlFormatter(style=util.THEME['theme'], bg_color='#ffffff')
+        except Exception:
+            self._lexer = None
+            self._formatter = None
+
         # 创建主布局
         main_layout = QHBoxLayout()
         self.setLayout(main_layout)
@@ -669,6 +956,8 @@ class DockerComposeEditor(QWidget):
         #self.services_tree.setFont(QFont("Arial", 14))
         self.services_tree.setIconSize(QSize(24, 24))
         self.services_tree.itemClicked.connect(self.on_service_selected)
+        # 服务名称到列表条目的映射，用于增量更新
+        self._tree_items = {}
         left_layout.addWidget(self.services_tree)
 
         add_service_btn = QPushButton("添加服务")
@@ -697,8 +986,19 @@ class DockerComposeEditor(QWidget):
         right_layout = QVBoxLayout()
         right_widget.setLayout(right_layout)
 
-        self.config_widget = QWidget()
-        right_layout.addWidget(self.config_widget)
+        # 每个服务的配置部件只创建一次，缓存在堆叠部件中，切换服务时直接显示
+        self.config_widget = None
+        self._service_widgets = {}
+        self._config_stack = QStackedWidget()
+        right_layout.addWidget(self._config_stack)
+
+        # 更新、保存结果以非模态的状态文字提示，几秒后自动清除
+        self._status_label = QLabel()
+        right_layout.addWidget(self._status_label)
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(2000)
+        self._status_timer.timeout.connect(self._status_label.clear)
 
         # 添加水平分割器部件
         horizontal_splitter.addWidget(left_widget)
@@ -722,14 +1022,14 @@ class DockerComposeEditor(QWidget):
         ps_btn.clicked.connect(lambda: self.execute_command("ps"))
         logs_btn = QPushButton("查看日志")
         logs_btn.clicked.connect(self.toggle_logs)
-        config_docker_btn = QPushButton("配置Docker")
-        config_docker_btn.clicked.connect(self.on_config_docker_clicked)
+        self.config_docker_btn = QPushButton("配置Docker")
+        self.config_docker_btn.clicked.connect(self.on_config_docker_clicked)
         button_layout.addWidget(up_btn)
         button_layout.addWidget(down_btn)
         button_layout.addWidget(restart_btn)
         button_layout.addWidget(ps_btn)
         button_layout.addWidget(logs_btn)
-        button_layout.addWidget(config_docker_btn)
+        button_layout.addWidget(self.config_docker_btn)
         command_layout.addLayout(button_layout)
 
         # 输出显示区域
@@ -740,35 +1040,72 @@ class DockerComposeEditor(QWidget):
         self.output_text.setFont(QFont("Courier New", 10))
         # 设置深色背景
         self.output_text.setStyleSheet("background-color: #1e1e1e; color: #d4d4d4;")
+        if self._formatter is not None:
+            self.output_text.document().setDefaultStyleSheet(self._formatter.get_style_defs('.highlight'))
+        # 限制保留的行数，避免长时间查看日志时内存无限增长
+        self.output_text.document().setMaximumBlockCount(5000)
+        self._end_cursor = QTextCursor(self.output_text.document())
         command_layout.addWidget(self.output_text)
+        self._signals.output_ready.connect(self.append_text, Qt.QueuedConnection)
+        self._signals.output_cleared.connect(self.clear_output, Qt.QueuedConnection)
+        self._signals.docker_config_finished.connect(self._on_docker_config_finished, Qt.QueuedConnection)
 
         # 添加垂直分割器部件
         vertical_splitter.addWidget(command_widget)
         vertical_splitter.setSizes([600, 200])  # 设置上下区域的比例
 
         # 加载配置
+        self._signals.config_loaded.connect(self._on_config_loaded, Qt.QueuedConnection)
+        self._signals.config_load_failed.connect(self._on_config_load_failed, Qt.QueuedConnection)
+        self._signals.config_saved.connect(self._on_config_saved, Qt.QueuedConnection)
+        self._signals.config_save_failed.connect(self._on_config_save_failed, Qt.QueuedConnection)
         self.load_config()
 
     def highlight_text(self, text):
+        if self._lexer is None:
+            return text
         try:
-            # 获取日志词法分析器
-            lexer = get_lexer_by_name("docker-compose-log")
-            formatter = HtmlFormatter(style=util.THEME['theme'], noclasses=True, bg_color='#ffffff')
             # 高亮文本
-            highlighted = highlight(text, lexer, formatter)
+            highlighted = highlight(text, self._lexer, self._formatter)
             return highlighted
         except:
             # 如果高亮失败，返回原始文本
             return text
 
     def append_text(self, text):
+        # 先放入待刷新队列，约一帧后统一刷新，连续多行输出只触发一次重绘
+        self._pending_output.append(text)
+        if len(self._pending_output) == 1:
+            QTimer.singleShot(16, self._flush_output)
+
+    def _flush_output(self):
+        if not self._pending_output:
+            return
+        # 整批拼接后只做一次高亮和一次插入，而不是逐行排版
+        text = "\n".join(self._pending_output)
+        self._pending_output.clear()
         # 高亮文本
         highlighted = self.highlight_text(text)
-        # 追加到输出区域
-        self.output_text.append(highlighted)
+        # 通过常驻的末尾光标追加到输出区域，插入期间暂停重绘
+        cursor = self._end_cursor
+        cursor.movePosition(QTextCursor.End)
+        self.output_text.setUpdatesEnabled(False)
+        if not self.output_text.document().isEmpty():
+            cursor.insertBlock()
+        if highlighted is text:
+            # 未高亮的纯文本按原样插入，保留换行
+            cursor.insertText(text)
+        else:
+            cursor.insertHtml(highlighted)
+        self.output_text.setUpdatesEnabled(True)
         # 滚动到底部
-        self.output_text.verticalScrollBar().setValue(
-            self.output_text.verticalScrollBar().maximum())
+        self.output_text.setTextCursor(cursor)
+        self.output_text.ensureCursorVisible()
+
+    def clear_output(self):
+        # 丢弃尚未刷新的旧输出，避免清空后又被追加回来
+        self._pending_output.clear()
+        self.output_text.clear()
 
     def execute_command(self, command):
         if command == "logs -f":
@@ -779,9 +1116,16 @@ class DockerComposeEditor(QWidget):
             QMessageBox.warning(self, "警告", "未配置SSH管理器")
             return
 
+        # 构建完整的docker-compose命令，排队交给线程池中的同一个执行器按顺序执行
+        full_command = f"docker compose -f {self.dirs}{self.file_name} {command}"
+        with self._command_lock:
+            self._command_queue.append(full_command)
+            if self._command_runner is None:
+                self._command_runner = _CommandRunner(self)
+                self._pool.start(self._command_runner)
+
+    def _run_command(self, full_command):
         try:
-            # 构建完整的docker-compose命令
-            full_command = f"docker compose -f {self.dirs}{self.file_name} {command}"
             if self.ssh.username == "root":
                 # 执行命令并获取输出
                 stdin, stdout, stderr = self.ssh.conn.exec_command(full_command)
@@ -790,39 +1134,40 @@ class DockerComposeEditor(QWidget):
                 # sudo 会通过 stdin 读取密码，写入密码并回车
                 stdin.write(f"{self.ssh.password}\n")
                 stdin.flush()
+        except Exception as e:
+            self._signals.output_ready.emit(f"执行命令时出错: {str(e)}")
+            return
 
+        self._track_channel(stdout.channel)
+        try:
             # 清空输出区域
-            self.output_text.clear()
+            self._signals.output_cleared.emit()
 
-            # 创建线程来读取输出
-            def read_output():
-                try:
-                    # 读取标准输出
-                    while True:
-                        line = stdout.readline()
-                        if not line:
-                            break
-                        if isinstance(line, bytes):
-                            line = line.decode('utf-8')
-                        self.append_text(line.strip())
-
-                    # 读取错误输出
-                    error = stderr.read()
-                    if error:
-                        if isinstance(error, bytes):
-                            error = error.decode('utf-8')
-                        self.append_text(f"\n{error}")
-                except Exception as e:
-                    self.append_text(f"读取输出时出错: {str(e)}")
-
-            # 启动线程
-            import threading
-            thread = threading.Thread(target=read_output)
-            thread.daemon = True
-            thread.start()
+            # 按批读取标准输出，每批只触发一次高亮和界面追加
+            _pump_channel(stdout.channel, self._signals.output_ready.emit)
 
+            # 读取错误输出
+            error = stderr.read()
+            if error:
+                if isinstance(error, bytes):
+                    error = error.decode('utf-8')
+                self._signals.output_ready.emit(f"\n{error}")
         except Exception as e:
-            QMessageBox.critical(self, "错误", f"执行命令时出错: {str(e)}")
+            self._signals.output_ready.emit(f"执行命令时出错: {str(e)}")
+        finally:
+            self._untrack_channel(stdout.channel)
+
+    def _track_channel(self, channel):
+        """登记正在执行远程命令的通道；窗口已在关闭时直接关闭通道，读取随即结束"""
+        with self._command_lock:
+            if not self._closing:
+                self._active_channels.add(channel)
+                return
+        channel.close()
+
+    def _untrack_channel(self, channel):
+        with self._command_lock:
+            self._active_channels.discard(channel)
 
     def start_logs(self):
         if not self.ssh:
@@ -831,47 +1176,53 @@ class DockerComposeEditor(QWidget):
 
         try:
             # 清空输出区域
-            self.output_text.clear()
-            if self.ssh.username == "root":
-                # 执行日志命令
-                stdin, stdout, stderr = self.ssh.conn.exec_command(f"docker compose -f {self.dirs}{self.file_name} logs -f")
-            else:
-                stdin, stdout, stderr = self.ssh.conn.exec_command(f"sudo -S docker compose -f {self.dirs}{self.file_name} logs -f")
+            self.clear_output()
+            command = f"docker compose -f {self.dirs}{self.file_name} logs -f"
+            if self.ssh.username != "root":
+                command = f"sudo -S {command}"
+            chan = self.ssh.conn.get_transport().open_session()
+            # 容器的 stderr 日志也会输出到 stderr；合并到 stdout 后 select 在其到达时同样能立即唤醒，
+            # 否则通道的可读通知只覆盖 stdout，只有 stderr 的输出会一直积压
+            chan.set_combine_stderr(True)
+            # 执行日志命令
+            chan.exec_command(command)
+            if self.ssh.username != "root":
                 # sudo 会通过 stdin 读取密码，写入密码并回车
-                stdin.write(f"{self.ssh.password}\n")
-                stdin.flush()
+                chan.sendall(f"{self.ssh.password}\n".encode('utf-8'))
 
             # 创建线程来读取输出
+            self.logs_channel = chan
+
             def read_logs():
                 self.logs_running = True
+                chan = self.logs_channel
                 try:
                     while self.logs_running:
-                        # 检查是否有新数据
-                        if stdout.channel.recv_ready():
-                            line = stdout.channel.recv(1024)
-                            if isinstance(line, bytes):
-                                line = line.decode('utf-8')
-                            self.append_text(line.strip())
-
-                        # 检查是否有错误
-                        if stderr.channel.recv_ready():
-                            error = stderr.channel.recv(1024)
-                            if isinstance(error, bytes):
-                                error = error.decode('utf-8')
-                            self.append_text(f"错误:\n{error}")
-
-                        # 短暂休眠以避免过度占用CPU
-                        import time
-                        time.sleep(0.1)
+                        # 阻塞等待通道可读，超时只用于及时响应停止请求
+                        readable, _, _ = select.select([chan], [], [], 0.5)
+                        if not readable:
+                            continue
+
+                        # 一次取完当前已到达的全部数据（stderr 已合并进来）
+                        output = bytearray()
+                        while chan.recv_ready():
+                            output += chan.recv(_OUTPUT_CHUNK)
+
+                        if output:
+                            self._signals.output_ready.emit(output.decode('utf-8', errors='replace').strip())
+                        # 远程命令已结束且数据读完
+                        elif chan.eof_received or chan.closed:
+                            break
 
                 except Exception as e:
                     if self.logs_running:  # 只在未主动停止时显示错误
-                        self.append_text(f"读取日志时出错: {str(e)}")
+                        self._signals.output_ready.emit(f"读取日志时出错: {str(e)}")
                 finally:
                     self.logs_running = False
+                    # 关闭通道，结束远程的 logs -f
+                    chan.close()
 
             # 启动线程
-            import threading
             self.logs_thread = threading.Thread(target=read_logs)
             self.logs_thread.daemon = True
             self.logs_thread.start()
@@ -894,6 +1245,23 @@ class DockerComposeEditor(QWidget):
     def closeEvent(self, event):
         # 停止日志查看
         self.stop_logs()
+        # 丢弃排队中的命令，执行器在当前命令结束后退出
+        with self._command_lock:
+            self._closing = True
+            self._command_queue.clear()
+            if self._command_runner is not None:
+                self._command_runner.cancelled = True
+                self._command_runner = None
+            channels = list(self._active_channels)
+            self._active_channels.clear()
+        # 关闭正在执行的 compose 命令和守护进程配置的通道，读取立即结束，不再等远程命令退出
+        for channel in channels:
+            channel.close()
+        # 还有未保存的修改时立即保存
+        self._flush_config()
+        # 关闭复用的 SFTP 会话，正在进行的上传完成后再关闭
+        with self._sftp_lock:
+            self._close_sftp()
         # 停止所有正在执行的命令
         # try:
         #     if hasattr(self, 'ssh') and self.ssh:
@@ -901,113 +1269,228 @@ class DockerComposeEditor(QWidget):
         # except:
         #     pass
         super().closeEvent(event)
+        if event.isAccepted():
+            self.closed.emit()
 
     def load_config(self):
         if not self.ssh:
             QMessageBox.warning(self, "警告", "未配置SSH管理器")
             return
 
-        try:
+        # 读取和解析放到线程池中执行，完成后通过信号回到界面线程刷新
+        self._pool.start(_ConfigLoader(self))
 
-            default_config = {
-                'version': '3.8',
-                'services': {},
-                'volumes': {},
-                'networks': {}
-            }
+    def _read_config(self):
+        """
+        在工作线程中读取并解析远程配置文件，文件不存在时创建默认配置
 
-            # 检查文件是否存在
+        返回 (配置, 新建文件时写入的内容)，读取已有文件时内容为 None；编辑器已在关闭时返回 None
+        """
+        default_config = {
+            'version': '3.8',
+            'services': {},
+            'volumes': {},
+            'networks': {}
+        }
+
+        with self._sftp_lock:
+            # 关闭时 SFTP 会话已关闭，不能再重新打开一个没人关闭的会话
+            if self._closing:
+                return None
+            sftp = self._get_sftp()
+            # 检查文件是否存在；权限不足、超时等其他错误直接报错，不能用默认配置覆盖远程文件
             try:
-                # 使用paramiko的SFTP方法读取文件
-                with self.ssh.open_sftp().open(f"{self.dirs}{self.file_name}", 'r') as f:
-                    content = f.read().decode('utf-8')
-            except Exception as e:
+                # 使用paramiko的SFTP方法打开文件
+                f = sftp.open(f"{self.dirs}{self.file_name}", 'rb')
+            except FileNotFoundError:
 
-                # 如果文件不存在，检查目录是否存在
+                # 如果文件不存在，直接尝试创建目录，目录已存在时忽略错误
                 try:
-                    self.ssh.open_sftp().stat(self.dirs)
-                except FileNotFoundError:
-                    self.ssh.open_sftp().mkdir(self.dirs)
+                    sftp.mkdir(self.dirs)
+                except IOError:
+                    pass
 
                 # 如果文件不存在，创建新的docker-compose.yml
-                content = yaml.dump(default_config, default_flow_style=False, sort_keys=False)
+                content = yaml.dump(default_config, Dumper=_YAML_DUMPER, default_flow_style=False, sort_keys=False)
                 # 使用paramiko的SFTP方法写入文件
-                with self.ssh.open_sftp().open(f"{self.dirs}{self.file_name}", 'w') as f:
-                    f.write(content.encode('utf-8'))
+                self._write_config_file(sftp, content)
                 # QMessageBox.information(self, "提示", "已创建新的docker-compose.yml文件")
-
-            self.config = yaml.safe_load(content) or default_config
-            self.update_services_tree()
-
-            # 默认选择第一个服务
-            if self.services_tree.topLevelItemCount() > 0:
-                first_item = self.services_tree.topLevelItem(0)
-                self.services_tree.setCurrentItem(first_item)
-                self.on_service_selected(first_item)
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"加载配置文件时出错: {str(e)}")
+                return default_config, content
+
+            # 预取让多个读请求同时在途，YAML 直接从远程文件流解析，不再先读成完整的字节串
+            with f:
+                f.prefetch()
+                return (yaml.load(f, Loader=_YAML_LOADER) or default_config), None
+
+    def _on_config_loaded(self, config, written_content):
+        self.config = config
+        if written_content is not None:
+            self._saved_content = written_content
+        self._config_dirty = False
+        # 重新加载后旧的配置部件已过期
+        self._drop_service_widgets()
+        self.update_services_tree(config.get('services', {}))
+
+        # 默认选择第一个服务
+        if self.services_tree.topLevelItemCount() > 0:
+            first_item = self.services_tree.topLevelItem(0)
+            self.services_tree.setCurrentItem(first_item)
+            self.on_service_selected(first_item)
+
+    def _on_config_load_failed(self, error):
+        QMessageBox.critical(self, "错误", f"加载配置文件时出错: {error}")
+
+    def _get_sftp(self):
+        """复用同一个 SFTP 会话，避免每次读写都重新打开通道；会话失效时重新打开"""
+        if self._sftp is not None:
+            try:
+                self._sftp.normalize('.')
+                return self._sftp
+            except Exception:
+                self._close_sftp()
+        self._sftp = self.ssh.open_sftp()
+        return self._sftp
+
+    def _write_config_file(self, sftp, content):
+        # putfo 以流水线方式分块写入，不逐个等待 WRITE 的响应，写完后校验远程文件大小
+        sftp.putfo(io.BytesIO(content.encode('utf-8')), f"{self.dirs}{self.file_name}")
+
+    def _close_sftp(self):
+        if self._sftp is not None:
+            try:
+                self._sftp.close()
+            except Exception:
+                pass
+            self._sftp = None
 
     def save_config(self):
         if not self.ssh:
             QMessageBox.warning(self, "警告", "未配置SSH管理器")
             return
 
+        # 上次保存后配置没有改动时不再重新序列化；已有上传在进行时等它完成后再保存
+        if not self._config_dirty or self._save_running:
+            return
+
         try:
-            content = yaml.dump(self.config, default_flow_style=False, sort_keys=False)
+            content = yaml.dump(self.config, Dumper=_YAML_DUMPER, default_flow_style=False, sort_keys=False)
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"保存配置时出错: {str(e)}")
+            return
+        self._config_dirty = False
+        # 内容与上次写入的一致时无需再次上传
+        if content == self._saved_content:
+            return
+        # 上传放到线程池中执行，完成后通过信号回到界面线程
+        self._save_running = True
+        self._save_seq += 1
+        self._pool.start(_ConfigSaver(self, content, self._save_seq))
+
+    def _upload_config(self, content, seq):
+        """写入远程配置文件，比已写入版本旧的内容直接丢弃"""
+        with self._sftp_lock:
+            if seq <= self._uploaded_seq:
+                return
             # 使用paramiko的SFTP方法写入文件
-            with self.ssh.open_sftp().open(f"{self.dirs}{self.file_name}", 'w') as f:
-                f.write(content.encode('utf-8'))
-            # QMessageBox.information(self, "成功", "配置已保存")
+            self._write_config_file(self._get_sftp(), content)
+            self._uploaded_seq = seq
+            if self._closing:
+                # 关闭前排队的最后一次上传，会话在 closeEvent 之后才打开，写完即关闭
+                self._close_sftp()
+
+    def _on_config_saved(self, content):
+        self._save_running = False
+        self._saved_content = content
+        self._show_status("配置已保存")
+        # 上传期间又有修改时继续保存
+        if self._config_dirty:
+            self.save_config()
+
+    def _on_config_save_failed(self, error):
+        self._save_running = False
+        self._config_dirty = True
+        QMessageBox.critical(self, "错误", f"保存配置时出错: {error}")
+
+    def _show_status(self, text):
+        self._status_label.setText(text)
+        self._status_timer.start()
+
+    def _flush_config(self):
+        """在界面线程中同步写入尚未保存的修改，用于关闭编辑器前"""
+        self._save_timer.stop()
+        if not self._config_dirty:
+            return
+        try:
+            content = yaml.dump(self.config, Dumper=_YAML_DUMPER, default_flow_style=False, sort_keys=False)
+            if content != self._saved_content:
+                self._save_seq += 1
+                self._upload_config(content, self._save_seq)
+                self._saved_content = content
+            self._config_dirty = False
         except Exception as e:
             QMessageBox.critical(self, "错误", f"保存配置时出错: {str(e)}")
 
-    def update_services_tree(self):
-        self.services_tree.clear()
-        for service_name in self.config.get('services', {}).keys():
-            item = QTreeWidgetItem([service_name])
-
-            # 设置图标
-            item.setIcon(0, QIcon(f":{service_name}_128.png"))
-
-            # 设置提示信息
-            service_info = self.config.get('services', {}).get(service_name, {})
-            tooltip = f"服务: {service_name}\n"
-            if 'image' in service_info:
-                tooltip += f"镜像: {service_info['image']}\n"
-            if 'ports' in service_info and service_info['ports']:
-                tooltip += f"端口: {', '.join(service_info['ports'])}\n"
-
-            item.setToolTip(0, tooltip)
-
-            self.services_tree.addTopLevelItem(item)
+    def update_services_tree(self, services=None):
+        # 只增删有变化的条目，保留已有条目及其选中状态
+        if services is None:
+            services = self.config.get('services', {})
+        self.services_tree.setUpdatesEnabled(False)
+        for service_name in set(self._tree_items) - set(services):
+            item = self._tree_items.pop(service_name)
+            self.services_tree.takeTopLevelItem(self.services_tree.indexOfTopLevelItem(item))
+
+        for service_name, service_info in services.items():
+            item = self._tree_items.get(service_name)
+            if item is None:
+                item = QTreeWidgetItem([service_name])
+                # 设置图标
+                item.setIcon(0, _service_icon(service_name))
+                self.services_tree.addTopLevelItem(item)
+                self._tree_items[service_name] = item
+
+            # 设置提示信息，已有条目的配置可能已修改，同样刷新
+            service_info = service_info or {}
+            parts = [f"服务: {service_name}"]
+            image = service_info.get('image')
+            if image:
+                parts.append(f"镜像: {image}")
+            ports = service_info.get('ports')
+            if ports:
+                parts.append(f"端口: {', '.join(str(port) for port in ports)}")
+
+            item.setToolTip(0, '\n'.join(parts))
+        self.services_tree.setUpdatesEnabled(True)
 
     def on_service_selected(self, item):
         service_name = item.text(0)
-        service_config = self.config['services'].get(service_name, {})
-
-        # 清除旧的配置部件
-        old_widget = self.config_widget
-        self.config_widget = ServiceConfigWidget(service_name, service_config, self)
-        self.config_widget.config_changed.connect(
-            lambda: self.update_service_config(service_name))
-
-        # 获取右侧编辑区域
-        vertical_splitter = self.layout().itemAt(0).widget()
-        horizontal_splitter = vertical_splitter.widget(0)
-        right_widget = horizontal_splitter.widget(1)
-        right_layout = right_widget.layout()
-        # 替换配置部件
-        if old_widget:
-            right_layout.replaceWidget(old_widget, self.config_widget)
-            old_widget.deleteLater()
-        else:
-            right_layout.addWidget(self.config_widget)
+        widget = self._service_widgets.get(service_name)
+        if widget is None:
+            service_config = self.config['services'].get(service_name, {})
+            widget = ServiceConfigWidget(service_name, service_config, self)
+            widget.config_changed.connect(
+                lambda: self.update_service_config(service_name))
+            self._service_widgets[service_name] = widget
+            self._config_stack.addWidget(widget)
+        self._config_stack.setCurrentWidget(widget)
+        self.config_widget = widget
+
+    def _drop_service_widgets(self, names=None):
+        """丢弃缓存的服务配置部件，names 为 None 时全部丢弃"""
+        for name in list(self._service_widgets) if names is None else names:
+            widget = self._service_widgets.pop(name, None)
+            if widget is None:
+                continue
+            if widget is self.config_widget:
+                self.config_widget = None
+            self._config_stack.removeWidget(widget)
+            widget.deleteLater()
 
     def update_service_config(self, service_name):
-        # 更新服务配置
-        self.config['services'][service_name] = self.config_widget.config
-        # 显示保存成功消息
-        QMessageBox.information(self, "成功", f"服务 {service_name} 的配置已更新")
+        # 更新服务配置，连续修改合并为一次保存
+        self.config['services'][service_name] = self._service_widgets[service_name].config
+        self._config_dirty = True
+        self._save_timer.start()
+        self._show_status(f"服务 {service_name} 的配置已更新")
 
     def on_config_docker_clicked(self):
         """配置Docker守护进程"""
@@ -1015,74 +1498,79 @@ class DockerComposeEditor(QWidget):
             QMessageBox.warning(self, "警告", "未配置SSH管理器")
             return
 
+        # 先同步禁用按钮，连续点击不会叠加对话框或重复执行配置，结束后由 docker_config_finished 恢复
+        self.config_docker_btn.setEnabled(False)
         dialog = DockerDaemonConfigDialog(self)
         if dialog.exec() == QDialog.Accepted:
             config = dialog.get_config()
             if not config:
+                self.config_docker_btn.setEnabled(True)
                 QMessageBox.warning(self, "警告", "配置内容为空或格式错误")
                 return
 
+            signals = self._signals
+
             # 在新线程中执行配置操作
             def apply_docker_config():
+                stdout = None
                 try:
                     password = self.ssh.password
                     config_json = json.dumps(config, indent=2)
 
-                    # 创建配置目录
-                    self.output_text.append("[配置Docker] 创建Docker配置目录...")
-                    mkdir_cmd = "sudo -S mkdir -p /etc/docker"
-                    stdin, stdout, stderr = self.ssh.conn.exec_command(mkdir_cmd)
-                    stdin.write(f"{password}\n")
-                    stdin.flush()
-                    exit_code = stdout.channel.recv_exit_status()
-                    if exit_code != 0:
-                        error = stderr.read().decode('utf-8')
-                        self.output_text.append(f"[配置Docker] 创建配置目录失败: {error}")
-                        return
-
-                    # 备份现有配置
-                    self.output_text.append("[配置Docker] 备份现有配置...")
-                    backup_cmd = "sudo -S cp /etc/docker/daemon.json /etc/docker/daemon.json.bak 2>/dev/null || true"
-                    stdin, stdout, stderr = self.ssh.conn.exec_command(backup_cmd)
-                    stdin.write(f"{password}\n")
-                    stdin.flush()
-                    stdout.channel.recv_exit_status()
-
-                    # 写入新配置
-                    self.output_text.append("[配置Docker] 写入新配置...")
-                    write_cmd = f"echo '{config_json}' | sudo tee /etc/docker/daemon.json"
-                    stdin, stdout, stderr = self.ssh.conn.exec_command(write_cmd)
+                    # (进度提示, 失败提示, 命令)，所有步骤合并为一个脚本，只执行一次远程命令和 sudo
+                    steps = [
+                        ("创建Docker配置目录", "创建配置目录", "mkdir -p /etc/docker"),
+                        ("备份现有配置", None,
+                         "cp /etc/docker/daemon.json /etc/docker/daemon.json.bak 2>/dev/null || true"),
+                        # 配置内容放在 here-document 中，整个脚本再整体转义，内容里的引号不会破坏命令
+                        ("写入新配置", "写入配置",
+                         f"cat > /etc/docker/daemon.json <<'DAEMON_EOF'\n{config_json}\nDAEMON_EOF"),
+                        ("重启Docker服务", "重启Docker服务", "systemctl restart docker"),
+                    ]
+                    script = "set -e\n" + "".join(
+                        f"echo '{_DAEMON_STEP_MARKER}{i}'\n{cmd}\n" for i, (_, _, cmd) in enumerate(steps))
+                    command = f"sh -c {shlex.quote(script)}"
+                    if self.ssh.username != "root":
+                        command = f"sudo -S {command}"
+                    stdin, stdout, stderr = self.ssh.conn.exec_command(command)
+                    self._track_channel(stdout.channel)
                     if self.ssh.username != "root":
+                        # sudo 的标准输入只用来读取密码
                         stdin.write(f"{password}\n")
                         stdin.flush()
-                    exit_code = stdout.channel.recv_exit_status()
-                    if exit_code != 0:
-                        error = stderr.read().decode('utf-8')
-                        self.output_text.append(f"[配置Docker] 写入配置失败: {error}")
-                        return
 
-                    # 重启Docker服务
-                    self.output_text.append("[配置Docker] 重启Docker服务...")
-                    restart_cmd = "sudo -S systemctl restart docker"
-                    stdin, stdout, stderr = self.ssh.conn.exec_command(restart_cmd)
-                    stdin.write(f"{password}\n")
-                    stdin.flush()
+                    # 每开始一个步骤脚本先输出标记行，据此显示进度并记住失败的步骤
+                    current = None
+                    for line in stdout:
+                        line = line.rstrip('\n')
+                        if line.startswith(_DAEMON_STEP_MARKER):
+                            current = steps[int(line[len(_DAEMON_STEP_MARKER):])]
+                            signals.output_ready.emit(f"[配置Docker] {current[0]}...")
+
                     exit_code = stdout.channel.recv_exit_status()
                     if exit_code != 0:
                         error = stderr.read().decode('utf-8')
-                        self.output_text.append(f"[配置Docker] 重启Docker服务失败: {error}")
+                        failed = current[1] if current and current[1] else "配置"
+                        signals.output_ready.emit(f"[配置Docker] {failed}失败: {error}")
                         return
 
-                    self.output_text.append("[配置Docker] Docker守护进程配置完成！")
+                    signals.output_ready.emit("[配置Docker] Docker守护进程配置完成！")
 
                 except Exception as e:
-                    self.output_text.append(f"[配置Docker] 配置过程中出现错误: {str(e)}")
+                    signals.output_ready.emit(f"[配置Docker] 配置过程中出现错误: {str(e)}")
+                finally:
+                    if stdout is not None:
+                        self._untrack_channel(stdout.channel)
+                    signals.docker_config_finished.emit()
+
+            # 清空输出区域，在编辑器的线程池中执行，不再每次单独创建线程
+            self.clear_output()
+            self._pool.start(apply_docker_config)
+        else:
+            self.config_docker_btn.setEnabled(True)
 
-            # 清空输出区域并启动线程
-            self.output_text.clear()
-            thread = threading.Thread(target=apply_docker_config)
-            thread.daemon = True
-            thread.start()
+    def _on_docker_config_finished(self):
+        self.config_docker_btn.setEnabled(True)
 
     def add_service(self):
         dialog = ServiceSearchDialog(self)
@@ -1090,10 +1578,9 @@ class DockerComposeEditor(QWidget):
             service_name, service_config = dialog.get_selected_service()
             if service_name:
                 self.config['services'][service_name] = service_config
+                self._config_dirty = True
+                # 覆盖同名服务时丢弃旧的配置部件
+                self._drop_service_widgets([service_name])
                 self.update_services_tree()
                 # 选择新添加的服务
-                for i in range(self.services_tree.topLevelItemCount()):
-                    item = self.services_tree.topLevelItem(i)
-                    if item.text(0) == service_name:
-                        self.services_tree.setCurrentItem(item)
-                        break
+                self.services_tree.setCurrentItem(self._tree_items[service_name])
@@ -9,6 +9,7 @@ import shutil
 import stat
 import tarfile
 import tempfile
+import time
 import zipfile
 from pathlib import Path
 from typing import Optional, Callable
@@ -16,6 +17,9 @@ from urllib.request import urlretrieve
 
 logger = logging.getLogger(__name__)
 
+# 下载进度回调的最小间隔（秒），约 60 次/秒
+_PROGRESS_INTERVAL = 0.016
+
 # FRP 版本和下载地址配置
 FRP_VERSION = "0.61.1"
 FRP_GITHUB_BASE = f"https://github.com/fatedier/frp/releases/download/v{FRP_VERSION}"
@@ -114,9 +118,16 @@ def download_with_progress(url: str, dest_path: str,
         是否下载成功
     """
 
+    last_report = [0.0]
+
     def report_hook(block_num, block_size, total_size):
         if progress_callback and total_size > 0:
             downloaded = block_num * block_size
+            # urlretrieve 每个数据块都会回调，按时间节流，避免进度信号淹没 GUI 事件队列（最后一块总会回调）
+            now = time.monotonic()
+            if downloaded < total_size and now - last_report[0] < _PROGRESS_INTERVAL:
+                return
+            last_report[0] = now
             progress_callback(downloaded, total_size)
 
     try:
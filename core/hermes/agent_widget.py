@@ -25,6 +25,28 @@ class ProfileItemDelegate(QStyledItemDelegate):
     ACTIVE_BAR_WIDTH = 3
     STATUS_DOT_RADIUS = 4
 
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 颜色、画笔和字体在构造时一次性创建，paint 中直接复用
+        self._bg_selected = QColor("#2a4a6b")
+        self._bg_hovered = QColor("#2a2a2a")
+        self._bg_normal = QColor("#1e1e1e")
+        self._active_bar_color = QColor("#1e90ff")
+        self._name_color = QColor("#ffffff")
+        self._running_color = QColor("#4caf50")
+        self._muted_color = QColor("#888888")
+        self._running_brush = QBrush(self._running_color)
+        self._stopped_brush = QBrush(self._muted_color)
+        self._separator_pen = QPen(QColor("#333333"), 0.5)
+
+        self._name_font = QFont()
+        self._name_font.setPixelSize(14)
+        self._name_font.setBold(True)
+        self._status_font = QFont()
+        self._status_font.setPixelSize(11)
+        self._model_font = QFont()
+        self._model_font.setPixelSize(12)
+
     def sizeHint(self, option, index):
         return QSize(option.rect.width(), self.ITEM_HEIGHT)
 
@@ -45,28 +67,25 @@ class ProfileItemDelegate(QStyledItemDelegate):
 
         # ─── 背景绘制 ───
         if is_selected:
-            bg_color = QColor("#2a4a6b")
+            bg_color = self._bg_selected
         elif is_hovered:
-            bg_color = QColor("#2a2a2a")
+            bg_color = self._bg_hovered
         else:
-            bg_color = QColor("#1e1e1e")
+            bg_color = self._bg_normal
         painter.fillRect(rect, bg_color)
 
         # ─── 活跃标识：左侧蓝色竖条 ───
         if is_active:
             bar_rect = QRect(rect.left(), rect.top() + 4,
                              self.ACTIVE_BAR_WIDTH, rect.height() - 8)
-            painter.fillRect(bar_rect, QColor("#1e90ff"))
+            painter.fillRect(bar_rect, self._active_bar_color)
 
         # ─── 文字区域起始 X ───
         text_x = rect.left() + self.PADDING_LEFT + (self.ACTIVE_BAR_WIDTH + 4 if is_active else 0)
 
         # ─── 第一行：Profile 名称 ───
-        name_font = QFont()
-        name_font.setPixelSize(14)
-        name_font.setBold(True)
-        painter.setFont(name_font)
-        painter.setPen(QColor("#ffffff"))
+        painter.setFont(self._name_font)
+        painter.setPen(self._name_color)
 
         name_y = rect.top() + self.PADDING_TOP + 14
         painter.drawText(text_x, name_y, profile.get("name", ""))
@@ -75,11 +94,9 @@ class ProfileItemDelegate(QStyledItemDelegate):
         gateway = profile.get("gateway", "stopped")
         is_running = gateway.lower() == "running"
         status_text = "running" if is_running else "stopped"
-        dot_color = QColor("#4caf50") if is_running else QColor("#888888")
+        status_color = self._running_color if is_running else self._muted_color
 
-        status_font = QFont()
-        status_font.setPixelSize(11)
-        painter.setFont(status_font)
+        painter.setFont(self._status_font)
         fm = painter.fontMetrics()
         status_text_width = fm.horizontalAdvance(status_text)
         dot_diameter = self.STATUS_DOT_RADIUS * 2
@@ -90,26 +107,24 @@ class ProfileItemDelegate(QStyledItemDelegate):
 
         # 绘制小圆点
         painter.setPen(Qt.NoPen)
-        painter.setBrush(QBrush(dot_color))
+        painter.setBrush(self._running_brush if is_running else self._stopped_brush)
         dot_center_y = status_y - fm.ascent() // 2
         painter.drawEllipse(status_x, dot_center_y - self.STATUS_DOT_RADIUS,
                             dot_diameter, dot_diameter)
 
         # 绘制状态文字
-        painter.setPen(QColor("#4caf50") if is_running else QColor("#888888"))
+        painter.setPen(status_color)
         painter.drawText(status_x + dot_diameter + 4, status_y, status_text)
 
         # ─── 第二行：模型名称 ───
-        model_font = QFont()
-        model_font.setPixelSize(12)
-        painter.setFont(model_font)
-        painter.setPen(QColor("#888888"))
+        painter.setFont(self._model_font)
+        painter.setPen(self._muted_color)
 
         model_y = rect.top() + self.PADDING_TOP + 14 + 18
         painter.drawText(text_x, model_y, profile.get("model", ""))
 
         # ─── 底部分隔线 ───
-        painter.setPen(QPen(QColor("#333333"), 0.5))
+        painter.setPen(self._separator_pen)
         painter.drawLine(rect.left() + 8, rect.bottom(),
                          rect.right() - 8, rect.bottom())
 
@@ -6,12 +6,15 @@ Hermes Agent 消息网关管理模块
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
                                 QLabel, QPushButton, QLineEdit, QGroupBox,
                                 QFrame, QFormLayout, QComboBox, QCheckBox,
-                                QMessageBox, QTextEdit, QScrollArea)
+                                QMessageBox, QPlainTextEdit, QScrollArea)
 from PySide6.QtCore import Qt, QThread, Signal
 import json
 
 from function.util import logger
 
+# 操作日志区域保留的最大行数
+_MAX_LOG_LINES = 1000
+
 # 支持的平台列表 —— fields 对应 .env 中 {PLATFORM_UPPER}_{FIELD_UPPER} 变量名
 PLATFORMS = [
     {"id": "telegram", "name": "Telegram", "fields": ["bot_token", "home_channel", "allowed_users"]},
@@ -313,8 +316,10 @@ class GatewayWidget(QWidget):
         # --- 底部：日志区域 ---
         log_group = QGroupBox(self.tr("操作日志"))
         log_layout = QVBoxLayout(log_group)
-        self._log_text = QTextEdit()
+        self._log_text = QPlainTextEdit()
         self._log_text.setReadOnly(True)
+        # 限制日志行数，长时间运行时自动丢弃最早的记录
+        self._log_text.setMaximumBlockCount(_MAX_LOG_LINES)
         self._log_text.setMaximumHeight(150)
         log_layout.addWidget(self._log_text)
         layout.addWidget(log_group)
@@ -580,4 +585,4 @@ class GatewayWidget(QWidget):
 
     def _append_log(self, text):
         """追加日志到底部文本区域"""
-        self._log_text.append(text)
+        self._log_text.appendPlainText(text)
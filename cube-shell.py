@@ -11,8 +11,10 @@ import sys
 import threading
 import time
 import uuid
+import weakref
 from bisect import bisect_left
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from socket import socket
 import PySide6
@@ -116,6 +118,7 @@ def abspath(path):
 class DockerInfoThread(QThread):
     """后台获取 Docker 信息的线程"""
     data_ready = Signal(dict, list)  # 分组信息, 容器列表
+    fetch_failed = Signal()  # 查询命令未能执行（如 SSH 通道打开失败）
 
     # 使用表格格式，用特殊分隔符分隔，比 JSON 更快更轻量
     # 使用 ||| 作为分隔符，不太可能出现在容器信息中
@@ -124,11 +127,20 @@ class DockerInfoThread(QThread):
     DOCKER_PS_FORMAT = '{{.ID}}|||{{.Names}}|||{{.Image}}|||{{.State}}|||{{.CreatedAt}}|||{{.Ports}}'
     # compose 格式需要额外的 Project 和 Name 字段
     COMPOSE_PS_FORMAT = '{{.ID}}|||{{.Name}}|||{{.Image}}|||{{.State}}|||{{.CreatedAt}}|||{{.Ports}}|||{{.Project}}'
+    # 并发查询最多同时占用的 SSH 通道数：同一连接上还有终端、SFTP、监控等通道，避免触及 sshd 的 MaxSessions
+    MAX_PARALLEL_QUERIES = 2
 
     def __init__(self, ssh_conn):
         super().__init__()
         self.ssh_conn = ssh_conn
 
+    def _query_result(self, future, cmd):
+        """取并发查询的结果；exec 返回 None 表示通道打开失败等错误，此时改为串行重试一次"""
+        output = future.result()
+        if output is None:
+            output = self.ssh_conn.exec(cmd)
+        return output
+
     def _parse_container_line(self, line):
         """解析表格格式的容器信息"""
         parts = line.split(self.FIELD_SEPARATOR)
@@ -153,53 +165,78 @@ class DockerInfoThread(QThread):
         compose_container_ids = set()  # 记录所有 compose 管理的容器 ID
 
         try:
-            # 获取 compose 项目列表（使用 JSON 格式，更可靠）
-            ls = self.ssh_conn.exec("docker compose ls -a --format json 2>/dev/null")
-            if ls and ls.strip():
-                try:
-                    # docker compose ls --format json 输出是 JSON 数组
-                    compose_projects = json.loads(ls.strip())
-                    for project in compose_projects:
-                        project_name = project.get('Name', '')
-                        config = project.get('ConfigFiles', '')
-                        if not config or not project_name:
-                            continue
-
-                        # 获取该项目的容器列表（使用 JSON 格式）
-                        ps_cmd = f"docker compose --file {config} ps -a --format json 2>/dev/null"
-                        conn_exec = self.ssh_conn.exec(ps_cmd)
-
-                        if conn_exec and conn_exec.strip():
-                            # docker compose ps --format json 输出可能是每行一个 JSON 或 JSON 数组
-                            for line in conn_exec.strip().splitlines():
-                                if line.strip():
-                                    try:
-                                        container = json.loads(line)
-                                        data = {
-                                            'ID': container.get('ID', ''),
-                                            'Name': container.get('Name', ''),
-                                            'Image': container.get('Image', ''),
-                                            'State': container.get('State', ''),
-                                            'CreatedAt': container.get('CreatedAt', ''),
-                                            'Ports': container.get('Ports', ''),
-                                            'Project': container.get('Project', project_name)
-                                        }
-                                        if data['ID']:
-                                            compose_container_ids.add(data['ID'])
-                                            groups[data['Project']].append(data)
-                                    except json.JSONDecodeError:
-                                        pass
-                except json.JSONDecodeError:
-                    # JSON 解析失败，可能是旧版 docker compose，回退到表格解析
-                    util.logger.warning("docker compose ls JSON parse failed, falling back to table parsing")
-
             # 获取所有独立容器（使用表格格式提升性能）
             # 分两次获取：运行中 + 已停止，比直接 -a 更快
+            running_cmd = f"docker ps --format '{self.DOCKER_PS_FORMAT}' 2>/dev/null"
+            exited_cmd = f"docker ps -f 'status=exited' -f 'status=created' -f 'status=dead' --format '{self.DOCKER_PS_FORMAT}' 2>/dev/null"
+
+            # 各查询互不依赖，并发执行以重叠各自的网络往返；每个查询占用一个 SSH 通道
+            with ThreadPoolExecutor(max_workers=self.MAX_PARALLEL_QUERIES) as pool:
+                running_future = pool.submit(self.ssh_conn.exec, running_cmd)
+                exited_future = pool.submit(self.ssh_conn.exec, exited_cmd)
+
+                # 获取 compose 项目列表（使用 JSON 格式，更可靠）
+                ls = self.ssh_conn.exec("docker compose ls -a --format json 2>/dev/null")
+                if ls is None:
+                    util.logger.warning("docker compose ls failed")
+                    self.fetch_failed.emit()
+                    return
+                project_futures = []
+                if ls and ls.strip():
+                    try:
+                        # docker compose ls --format json 输出是 JSON 数组
+                        compose_projects = json.loads(ls.strip())
+                        for project in compose_projects:
+                            project_name = project.get('Name', '')
+                            config = project.get('ConfigFiles', '')
+                            if not config or not project_name:
+                                continue
+
+                            # 获取该项目的容器列表（使用 JSON 格式）
+                            ps_cmd = f"docker compose --file {config} ps -a --format json 2>/dev/null"
+                            project_futures.append((project_name, ps_cmd, pool.submit(self.ssh_conn.exec, ps_cmd)))
+                    except json.JSONDecodeError:
+                        # JSON 解析失败，可能是旧版 docker compose，回退到表格解析
+                        util.logger.warning("docker compose ls JSON parse failed, falling back to table parsing")
+
+                # 查询失败不能当作"没有容器"展示，否则树中会静默丢失项目或整组容器
+                project_outputs = []
+                for project_name, ps_cmd, future in project_futures:
+                    project_outputs.append((project_name, self._query_result(future, ps_cmd)))
+                running_output = self._query_result(running_future, running_cmd)
+                exited_output = self._query_result(exited_future, exited_cmd)
+            if running_output is None or exited_output is None or any(
+                    output is None for _, output in project_outputs):
+                util.logger.warning("docker ps failed")
+                self.fetch_failed.emit()
+                return
+
+            for project_name, conn_exec in project_outputs:
+                if conn_exec and conn_exec.strip():
+                    # docker compose ps --format json 输出可能是每行一个 JSON 或 JSON 数组
+                    for line in conn_exec.strip().splitlines():
+                        if line.strip():
+                            try:
+                                container = json.loads(line)
+                                data = {
+                                    'ID': container.get('ID', ''),
+                                    'Name': container.get('Name', ''),
+                                    'Image': container.get('Image', ''),
+                                    'State': container.get('State', ''),
+                                    'CreatedAt': container.get('CreatedAt', ''),
+                                    'Ports': container.get('Ports', ''),
+                                    'Project': container.get('Project', project_name)
+                                }
+                                if data['ID']:
+                                    compose_container_ids.add(data['ID'])
+                                    groups[data['Project']].append(data)
+                            except json.JSONDecodeError:
+                                pass
+
             standalone_containers = []
 
-            # 1. 获取运行中的容器
-            running_cmd = f"docker ps --format '{self.DOCKER_PS_FORMAT}' 2>/dev/null"
-            conn_exec = self.ssh_conn.exec(running_cmd)
+            # 1. 运行中的容器
+            conn_exec = running_output
             if conn_exec:
                 for ps in conn_exec.strip().splitlines():
                     if ps.strip():
@@ -207,9 +244,8 @@ class DockerInfoThread(QThread):
                         if data and data['ID'] and data['ID'] not in compose_container_ids:
                             standalone_containers.append(data)
 
-            # 2. 获取已停止的容器
-            exited_cmd = f"docker ps -f 'status=exited' -f 'status=created' -f 'status=dead' --format '{self.DOCKER_PS_FORMAT}' 2>/dev/null"
-            conn_exec = self.ssh_conn.exec(exited_cmd)
+            # 2. 已停止的容器
+            conn_exec = exited_output
             if conn_exec:
                 for ps in conn_exec.strip().splitlines():
                     if ps.strip():
@@ -232,6 +268,9 @@ class CommonContainersThread(QThread):
     """后台获取常用容器信息的线程"""
     data_ready = Signal(dict, bool)  # 服务配置, 是否安装Docker
 
+    # Docker 已安装的检测结果在该时间（秒）内复用
+    DOCKER_CHECK_TTL = 60
+
     def __init__(self, ssh_conn, config_path):
         super().__init__()
         self.ssh_conn = ssh_conn
@@ -243,11 +282,15 @@ class CommonContainersThread(QThread):
             return
 
         try:
-            data_ = self.ssh_conn.exec('docker --version')
+            # 同一连接在有效期内检测到过 Docker 时不再重复检测；未安装的结果不缓存，安装后能立即识别
+            checked_at = self.ssh_conn.docker_checked_at
+            if checked_at is None or time.monotonic() - checked_at > self.DOCKER_CHECK_TTL:
+                data_ = self.ssh_conn.exec('docker --version')
 
-            if not data_:
-                self.data_ready.emit({}, False)
-                return
+                if not data_:
+                    self.data_ready.emit({}, False)
+                    return
+                self.ssh_conn.docker_checked_at = time.monotonic()
 
             # 优化：只获取容器名称，不需要全部 JSON 信息
             # 这样在容器数量多时也能快速返回
@@ -290,25 +333,32 @@ class DockerOperationThread(QThread):
             return
 
         try:
-            for container_id in self.container_ids:
-                cmd = f"docker {self.operation} {container_id}"
-                # 使用 sudo_exec 并等待命令完成
-                self.ssh_conn.exec(cmd)
+            # docker 命令一次接受多个容器，所有容器在一次远程调用中处理，并等待命令完成
+            self.ssh_conn.exec(f"docker {self.operation} {' '.join(self.container_ids)}")
 
             # 操作完成后，获取被操作容器的最新状态和端口信息
             container_info = {}
             if self.operation != 'rm':
+                # 一次查询所有被操作容器的状态和端口（多个 id 过滤条件为“或”关系）
+                filters = ' '.join(f"--filter 'id={container_id}'" for container_id in self.container_ids)
+                result = self.ssh_conn.exec(
+                    f"docker ps -a {filters} --format '{{{{.ID}}}}|||{{{{.State}}}}|||{{{{.Ports}}}}' 2>/dev/null"
+                )
+                rows = []
+                for line in (result or '').strip().splitlines():
+                    parts = line.strip().split('|||')
+                    if parts[0]:
+                        rows.append(parts)
+
                 for container_id in self.container_ids:
-                    # 查询容器最新状态和端口（使用 docker ps 格式，与列表一致）
-                    result = self.ssh_conn.exec(
-                        f"docker ps -a --filter 'id={container_id}' --format '{{{{.State}}}}|||{{{{.Ports}}}}' 2>/dev/null"
-                    )
                     state = ''
                     ports_str = ''
-                    if result and result.strip():
-                        parts = result.strip().split('|||')
-                        state = parts[0] if len(parts) > 0 else ''
-                        ports_str = parts[1] if len(parts) > 1 else ''
+                    # 输出的是短 ID，与传入的 ID 按前缀对应
+                    for parts in rows:
+                        if parts[0].startswith(container_id) or container_id.startswith(parts[0]):
+                            state = parts[1] if len(parts) > 1 else ''
+                            ports_str = parts[2] if len(parts) > 2 else ''
+                            break
 
                     container_info[container_id] = {
                         'state': state,
@@ -657,6 +707,8 @@ class MainDialog(QMainWindow):
         self.ssh_clients = {}
         # 存储 RDP 会话（RDPWidget），key 为 tab 的 tabWhatsThis
         self.rdp_clients = {}
+        # 已打开的 compose 编排窗口，key 为连接 id，窗口关闭后移除
+        self.compose_editors = {}
         icon = QIcon(":icons8-home-48")
         self.ui.ShellTab.tabBar().setTabIcon(0, icon)
 
@@ -4743,8 +4795,17 @@ class MainDialog(QMainWindow):
 
             self.docker_thread = DockerInfoThread(ssh_conn)
             self.docker_thread.data_ready.connect(self.update_docker_ui)
+            self.docker_thread.fetch_failed.connect(self.on_docker_info_failed)
             self.docker_thread.start()
 
+    @Slot()
+    def on_docker_info_failed(self):
+        """Docker 信息查询失败时提示刷新，而不是显示为空列表"""
+        self.ui.treeWidgetDocker.clear()
+        failed_item = QTreeWidgetItem()
+        failed_item.setText(0, self.tr("获取 Docker 信息失败，请稍后刷新"))
+        self.ui.treeWidgetDocker.addTopLevelItem(failed_item)
+
     @Slot(dict, list)
     def update_docker_ui(self, groups, container_list):
         """更新 Docker UI (槽函数)"""
@@ -4837,6 +4898,36 @@ class MainDialog(QMainWindow):
         self.common_docker_thread.data_ready.connect(self.update_common_containers_ui)
         self.common_docker_thread.start()
 
+    @Slot(object)
+    def open_compose_editor(self, ssh_conn):
+        """打开连接的 compose 编排窗口，同一连接已打开时直接激活"""
+        conn_id = ssh_conn.id
+        editor = self.compose_editors.get(conn_id)
+        if editor is not None:
+            try:
+                editor.raise_()
+                editor.activateWindow()
+                return
+            except RuntimeError:
+                # C++ 对象已销毁，忽略旧窗口引用
+                self.compose_editors.pop(conn_id, None)
+
+        editor = DockerComposeEditor(ssh=ssh_conn)
+        # 关闭即销毁，释放窗口控件、线程池和缓存的服务配置部件
+        editor.setAttribute(Qt.WA_DeleteOnClose)
+        # 回调只持有弱引用，不让编辑器自身的信号连接把它留在内存里
+        editor_ref = weakref.ref(editor)
+        editor.closed.connect(lambda: self.forget_compose_editor(conn_id, editor_ref))
+        editor.destroyed.connect(lambda *_: self.forget_compose_editor(conn_id, editor_ref))
+        self.compose_editors[conn_id] = editor
+        editor.show()
+
+    def forget_compose_editor(self, conn_id, editor_ref):
+        """编排窗口关闭或销毁后移除引用，只移除该窗口自己，不误删同一连接后来打开的窗口"""
+        editor = editor_ref()
+        if editor is not None and self.compose_editors.get(conn_id) is editor:
+            del self.compose_editors[conn_id]
+
     @Slot(dict, bool)
     def update_common_containers_ui(self, services_config, has_docker):
         """更新常用容器 UI"""
@@ -4884,6 +4975,7 @@ class MainDialog(QMainWindow):
 
                 # 创建自定义组件
                 widget = CustomWidget(key, item, ssh_conn)
+                widget.orchestration_requested.connect(self.open_compose_editor)
                 container_layout.addWidget(widget)
 
                 # 添加到网格布局
@@ -5139,12 +5231,14 @@ class MainDialog(QMainWindow):
             # 启动线程
             self.compress_thread = CompressThread(ssh_conn, files, filename, format_type, ssh_conn.pwd)
             self.compress_thread.finished_sig.connect(self.on_compress_finished)
+            self.compress_thread.progress_sig.connect(self.on_archive_progress)
 
             # 进度对话框
             self.progress_dialog = QProgressDialog(self.tr("正在压缩..."), self.tr("取消"), 0, 0, self)
             self.progress_dialog.setWindowTitle(self.tr("请稍候"))
             self.progress_dialog.setWindowModality(Qt.WindowModal)
             self.progress_dialog.setMinimumDuration(0)  # 立即显示
+            self.progress_dialog.setAutoReset(False)  # 进度到 100% 时不自动关闭，由线程结束信号关闭
             self.progress_dialog.canceled.connect(self.compress_thread.requestInterruption)
 
             # 线程结束时关闭对话框
@@ -5161,6 +5255,13 @@ class MainDialog(QMainWindow):
             if not self.progress_dialog.wasCanceled():
                 QMessageBox.warning(self, self.tr("压缩失败"), msg)
 
+    def on_archive_progress(self, done, total, name):
+        # 压缩/解压的逐文件进度：从忙碌状态切换为 done/total，并显示当前文件
+        title = self.progress_dialog.labelText().split("\n", 1)[0]
+        self.progress_dialog.setMaximum(total)
+        self.progress_dialog.setValue(done)
+        self.progress_dialog.setLabelText(f"{title}\n{os.path.basename(name)}")
+
     def rename(self):
         ssh_conn = self.ssh()
         selected_items = self.ui.treeWidget.selectedItems()
@@ -5197,12 +5298,14 @@ class MainDialog(QMainWindow):
         # 启动线程
         self.decompress_thread = DecompressThread(ssh_conn, files, ssh_conn.pwd)
         self.decompress_thread.finished_sig.connect(self.on_decompress_finished)
+        self.decompress_thread.progress_sig.connect(self.on_archive_progress)
 
         # 进度对话框
         self.progress_dialog = QProgressDialog(self.tr("正在解压..."), self.tr("取消"), 0, 0, self)
         self.progress_dialog.setWindowTitle(self.tr("请稍候"))
         self.progress_dialog.setWindowModality(Qt.WindowModal)
         self.progress_dialog.setMinimumDuration(0)
+        self.progress_dialog.setAutoReset(False)
         self.progress_dialog.canceled.connect(self.decompress_thread.requestInterruption)
 
         # 线程结束时关闭对话框
@@ -6394,6 +6497,9 @@ class KillProcessThread(QThread):
 
 
 class CustomWidget(QWidget):
+    # 请求打开连接的 compose 编排窗口，参数：ssh_conn
+    orchestration_requested = Signal(object)
+
     def __init__(self, key, item, ssh_conn, parent=None):
         super().__init__(parent)
 
@@ -6417,7 +6523,7 @@ class CustomWidget(QWidget):
             # 安装按钮
             self.install_button = QPushButton(self.tr("安装"), self)
             self.install_button.setCursor(QCursor(Qt.PointingHandCursor))
-            self.install_button.clicked.connect(lambda: self.container_orchestration(ssh_conn))
+            self.install_button.clicked.connect(lambda: self.orchestration_requested.emit(ssh_conn))
             self.install_button.setStyleSheet(InstallButtonStyle)
             self.button_layout.addWidget(self.install_button)
         else:
@@ -6453,10 +6559,6 @@ class CustomWidget(QWidget):
             }
             """)
 
-    def container_orchestration(self, ssh_conn):
-        compose = DockerComposeEditor(ssh=ssh_conn)
-        compose.show()
-
 
 # docker容器安装
 class InstallDocker(QDialog):
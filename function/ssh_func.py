@@ -95,6 +95,8 @@ class SshClient(object):
 
         # 是否已经加载过常用容器列表
         self.refresh_docker_common_containers_has_executed = False
+        # 最近一次检测到 Docker 已安装的时间（time.monotonic()），None 表示尚未检测到
+        self.docker_checked_at = None
 
     @property
     def is_jumpserver_proxy(self):
@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 import shutil
@@ -34,6 +35,9 @@ APP_NAME = "cube-shell"
 # 日志记录
 logger = logging.getLogger(__name__)
 
+# YAML 解析优先使用 libyaml 的 C 实现，未编译 libyaml 时回退到纯 Python 实现
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 # 文件夹图标缓存：QFileIconProvider 创建开销大，全局只创建一次
 _FOLDER_ICON_CACHE = None
@@ -226,7 +230,7 @@ def read_json_file(file_path):
 def load_yml_config(file_path):
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f) or {
+            return yaml.load(f, Loader=_YAML_LOADER) or {
                 'version': '3.8',
                 'services': {},
                 'volumes': {},
@@ -236,6 +240,10 @@ def load_yml_config(file_path):
         print(f"An unexpected error occurred: {e}")
 
 
+# 常用容器配置解析缓存：路径 → (mtime_ns, size, services)，文件未变化时不再重复解析 YAML
+_COMPOSE_SERVICE_CACHE = {}
+
+
 def get_compose_service(file_path):
     """
     从YAML文件中获取服务名称列表
@@ -243,16 +251,21 @@ def get_compose_service(file_path):
     :return: 服务名称列表
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            compose_data = yaml.safe_load(f) or {
-                'version': '3.8',
-                'services': {},
-                'volumes': {},
-                'networks': {}
-            }
-
-        # 获取 services 字典的所有键（服务名称）
-        return compose_data.get('services', {})
+        st = os.stat(file_path)
+        cached = _COMPOSE_SERVICE_CACHE.get(file_path)
+        if cached is None or cached[0] != st.st_mtime_ns or cached[1] != st.st_size:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                compose_data = yaml.load(f, Loader=_YAML_LOADER) or {
+                    'version': '3.8',
+                    'services': {},
+                    'volumes': {},
+                    'networks': {}
+                }
+            cached = (st.st_mtime_ns, st.st_size, compose_data.get('services', {}))
+            _COMPOSE_SERVICE_CACHE[file_path] = cached
+
+        # 获取 services 字典的所有键（服务名称）；调用方会写入 has 属性，返回副本避免污染缓存
+        return copy.deepcopy(cached[2])
 
     except FileNotFoundError:
         print(f"错误：文件 {file_path} 不存在")